@@ -1,8 +1,12 @@
 # Author: Anthony Sokry
 # Updated: September 2025
 
+import traceback
+from collections import deque
 from tkinter import *
 from ChessGame import ChessGame
+from module.ChessMetrics import timed
+from module.EngineWorker import EngineWorker
 
 
 
@@ -11,17 +15,27 @@ class ChessGUI:
     Represents a graphical user interface for Fog of War chess game.
     Uses ChessGame class for game data.
     """
-    def __init__(self, game):
+    def __init__(self, game, bot=None, bot_color="black"):
         """
-        Initializes graphical user interface.
+        Takes a chess game, an optional move policy, and the color the
+        policy plays as parameters. Initializes graphical user interface.
+        Moves are made on a background worker so the window never waits
+        for the engine or the computer opponent.
         """
         self._game = game
-        self._board_dict = {0: 'a', 100: 'b', 200: 'c', 300: 'd', 400: 'e', 500: 'f', 600: 'g', 700: 'h'}
+        self._geometry = game.get_geometry()
+
+        # Computer opponent and background worker
+        self._bot = bot
+        self._bot_color = bot_color
+        self._worker = EngineWorker()
+        self._poll_interval = 20 # In milliseconds
+        self._input_queue = deque()
 
         # Instantiate a window instance
-        self._window_size_width = 800
-        self._window_size_height = 800
         self._square_size = 100
+        self._window_size_width = self._geometry.get_width() * self._square_size
+        self._window_size_height = self._geometry.get_height() * self._square_size
         self._window = Tk() 
         self._window.geometry(f"{self._window_size_width}x{self._window_size_height}")
         self._window.config(background="gray")
@@ -40,8 +54,8 @@ class ChessGUI:
         self._canvas.pack()
 
         # Board information
-        self._board_width = 8
-        self._board_height = 8
+        self._board_width = self._geometry.get_width()
+        self._board_height = self._geometry.get_height()
         self._total_squares = self._board_width * self._board_height
         self._brown_square = PhotoImage(file='assets/brown-square.png')
         self._light_brown_square = PhotoImage(file='assets/light-brown-square.png')
@@ -50,10 +64,12 @@ class ChessGUI:
         # Chess movement information
         self._img_to_move = None
         self._img_chess_pos = None
+        self._legal_targets = frozenset()
+        self._highlight_ids = []
+        self._highlight_color = "yellow"
         self._hidden = PhotoImage(file='assets/hidden.png')
 
         # Chess pieces information
-        self._total_pieces = 32
         b_rook = PhotoImage(file='assets/black_pieces/b_r.png')
         b_knight = PhotoImage(file='assets/black_pieces/b_n.png')
         b_bishop = PhotoImage(file='assets/black_pieces/b_b.png')
@@ -66,14 +82,16 @@ class ChessGUI:
         w_queen = PhotoImage(file='assets/white_pieces/w_q.png')
         w_king = PhotoImage(file='assets/white_pieces/w_k.png')
         w_pawn = PhotoImage(file='assets/white_pieces/w_p.png')
-        self._b_piece_order = [b_rook, b_knight, b_bishop, b_queen, b_king, b_bishop, b_knight, b_rook]
-        self._w_piece_order = [w_rook, w_knight, w_bishop, w_queen, w_king, w_bishop, w_knight, w_rook]
         self._pieces_dict = {
             'p': b_pawn, 'r': b_rook, 'n': b_knight, 'b': b_bishop, 'q': b_queen, 'k': b_king,
             'P': w_pawn, 'R': w_rook, 'N': w_knight, 'B': w_bishop, 'Q': w_queen, 'K': w_king
         }
         self.create_pieces_gui()
 
+        # Check for finished engine work and let the computer opponent start
+        self._window.after(self._poll_interval, self.poll_worker)
+        self.request_bot_move()
+
     def on_click_img(self, event):
         """
         On click event for chess piece images. Click on a valid chess 
@@ -82,7 +100,15 @@ class ChessGUI:
         # Check if the game is over
         if self._game.is_game_over() or self._pause is True:
             return
-        
+
+        # Queue clicks until the engine has finished
+        if self._worker.is_busy() or self.is_bot_turn():
+            self._input_queue.append(event)
+            return
+
+        # Remove highlights so they are not found instead of the clicked image
+        self.clear_highlights()
+
         img_id = self._canvas.find_closest(event.x, event.y)
         # Check if an image id was found
         if img_id is not None:
@@ -98,30 +124,168 @@ class ChessGUI:
                 piece = self._game.get_piece_at(array_pos)
                 if self._game.is_valid_piece(array_pos, piece):
                     self._img_to_move = img_id[0]
+                    # Show where the piece can move to
+                    self._legal_targets = self._game.get_legal_targets(array_pos)
+                    self.highlight_targets(self._legal_targets)
                 else:
                     self.clear_move_info()
                     self.display_text(f"Player Turn: {self._game.get_player_turn()}")
             else:
                 # Capture target piece image
-                if self._game.make_move(self._img_chess_pos, chess_pos):
-                    self.move_img(self._img_to_move, img_id)
-                    self.delete_canvas_item(img_id)
-                    self.toggle_pieces()
+                if array_pos in self._legal_targets:
+                    self.submit_move(chess_pos, img_id[0], True)
                 else:
                     self.display_text("Invalid Capture")
                 self.clear_move_info()
         elif img_id[0] <= self._total_squares and self._img_to_move is not None:
             # Move piece image to blank square
-            if self._game.make_move(self._img_chess_pos, chess_pos):
-                self.move_img(self._img_to_move, img_id)
-                self.toggle_pieces()
+            if array_pos in self._legal_targets:
+                self.submit_move(chess_pos, img_id[0], False)
             else:
                 self.display_text("Invalid Move")
             self.clear_move_info()
 
+    def submit_move(self, chess_pos, target_id, is_capture):
+        """
+        Takes a target chess position, the id of the image at the target,
+        and whether the move is a capture as parameters. Makes the selected
+        move on the background worker and updates the images once it is done.
+        """
+        img_to_move = self._img_to_move
+        move_from = self._img_chess_pos
+
+        def on_move_made(is_moved):
+            if is_moved:
+                self.move_img(img_to_move, target_id)
+                if is_capture:
+                    self.delete_canvas_item(target_id)
+                self.toggle_pieces()
+            else:
+                self.display_text("Invalid Move")
+            self.after_move()
+
+        self._worker.submit(on_move_made, self._game.make_move, move_from, chess_pos,
+                            on_error=self.on_move_error)
+
+    def is_bot_turn(self):
+        """
+        Returns true if the computer opponent is playing the current turn.
+        """
+        return self._bot is not None and self._game.get_player_turn() == self._bot_color and \
+            self._game.get_game_state() == "UNFINISHED"
+
+    def request_bot_move(self):
+        """
+        Asks the computer opponent for a move on the background worker
+        if it is playing the current turn.
+        """
+        if self.is_bot_turn():
+            self._worker.submit(self.on_bot_move, self.make_bot_move, on_error=self.on_bot_error)
+
+    def make_bot_move(self):
+        """
+        Runs on the background worker. Gets a move from the computer
+        opponent and makes it. Returns true if a move was made.
+        """
+        move = self._bot(self._game, self._bot_color)
+        if move is None:
+            return False
+        move_from = self._geometry.pos_to_location(self._geometry.square_to_pos(move[0]))
+        move_to = self._geometry.pos_to_location(self._geometry.square_to_pos(move[1]))
+        return self._game.make_move(move_from, move_to)
+
+    def on_bot_move(self, is_moved):
+        """
+        Redraws the pieces after the computer opponent has moved.
+        """
+        if is_moved:
+            self.redraw_pieces()
+            self.after_move()
+        else:
+            self.stop_bot()
+
+    def on_bot_error(self, error):
+        """
+        Takes the error raised while the computer opponent was moving as a
+        parameter. Logs the error and stops asking the computer for moves.
+        """
+        traceback.print_exception(error)
+        self.stop_bot()
+
+    def stop_bot(self):
+        """
+        Stops asking the computer opponent for moves after it failed to
+        make one, so it is not asked again on every poll. The turn is
+        handed back and the player makes the moves for both colors.
+        """
+        self._bot = None
+        self._input_queue.clear()
+        self.redraw_pieces()
+        if self._game.is_game_over():
+            self.display_text(f"{self._game.get_game_state()}", True)
+        else:
+            self.display_text("Computer could not move")
+
+    def on_move_error(self, error):
+        """
+        Takes the error raised while making the player's move as a parameter.
+        Logs the error, redraws the pieces to match the game, and keeps
+        handling clicks.
+        """
+        traceback.print_exception(error)
+        self.redraw_pieces()
+        self.display_text("Invalid Move")
+        self.after_move()
+
+    def on_replay_error(self, error):
+        """
+        Takes the error raised while loading a replay as a parameter.
+        Logs the error, redraws the pieces to match the game, and keeps
+        handling clicks.
+        """
+        traceback.print_exception(error)
+        self.redraw_pieces()
+        self.display_text("Replay could not be loaded")
+        self.after_move()
+
+    def load_replay(self, moves):
+        """
+        Takes a sequence of moves, as square index pairs, as a parameter.
+        Applies the moves on the background worker and redraws the pieces
+        once they have all been applied.
+        """
+        def on_replay_loaded(illegal_index):
+            self.redraw_pieces()
+            if illegal_index is not None:
+                self.display_text(f"Replay stopped at move {illegal_index + 1}")
+            self.after_move()
+
+        self._worker.submit(on_replay_loaded, self._game.apply_moves, moves, on_error=self.on_replay_error)
+
+    def after_move(self):
+        """
+        Checks if the game is over. Otherwise lets the computer
+        opponent move or handles clicks made while the engine was busy.
+        """
         # Re-check if game is over
         if self._game.is_game_over():
+            self._input_queue.clear()
             self.display_text(f"{self._game.get_game_state()}", True)
+            return
+
+        self.request_bot_move()
+        while len(self._input_queue) > 0 and not self._worker.is_busy() and not self.is_bot_turn():
+            self.on_click_img(self._input_queue.popleft())
+
+    def poll_worker(self):
+        """
+        Handles finished engine work and schedules the next check.
+        The next check is scheduled even if handling the work fails.
+        """
+        try:
+            self._worker.poll()
+        finally:
+            self._window.after(self._poll_interval, self.poll_worker)
 
     def to_chess_pos(self, img_id):
         """
@@ -129,11 +293,11 @@ class ChessGUI:
         """
         # Get image's coordinates
         x1, y1, x2, y2 = self._canvas.bbox(img_id)
-        
+
         # Convert to chess coordinates
-        x1 = self._board_dict[x1]
-        y1 = self._board_height - int(str(y1)[0])
-        pos = x1 + str(y1)
+        row = y1 // self._square_size
+        col = x1 // self._square_size
+        pos = self._geometry.pos_to_location((row, col))
 
         return pos
     
@@ -150,6 +314,31 @@ class ChessGUI:
         """
         self._img_to_move = None
         self._img_chess_pos = None
+        self._legal_targets = frozenset()
+        self.clear_highlights()
+
+    def highlight_targets(self, targets):
+        """
+        Takes a set of list positions as a parameter.
+        Outlines the squares at the given positions.
+        """
+        for row, col in targets:
+            x1 = col * self._square_size
+            y1 = row * self._square_size
+            x2 = x1 + self._square_size - 1
+            y2 = y1 + self._square_size - 1
+            # Disabled outlines let clicks through to the images beneath them
+            rect_id = self._canvas.create_rectangle(x1 + 2, y1 + 2, x2 - 2, y2 - 2, outline=self._highlight_color,
+                                                    width=4, state=DISABLED)
+            self._highlight_ids.append(rect_id)
+
+    def clear_highlights(self):
+        """
+        Removes any highlighted squares.
+        """
+        for rect_id in self._highlight_ids:
+            self.delete_canvas_item(rect_id)
+        self._highlight_ids.clear()
 
     def create_board_gui(self):
         """
@@ -183,34 +372,39 @@ class ChessGUI:
         """
         Create chess piece graphical user interface.
         """
-        for piece_num in range(self._total_pieces):
-            piece_x = (piece_num % 8) * self._square_size
-            if piece_num <= 7: 
-                # Black pieces, that are not pawns
-                piece = self._b_piece_order[piece_num]
-                piece_y = 0 * self._square_size
-                img_id = self._canvas.create_image(piece_x, piece_y, image=piece, anchor=NW)
-            elif piece_num > 7 and piece_num <= 15: 
-                # Black pawns
-                piece_y = 1 * self._square_size
-                img_id = self._canvas.create_image(piece_x, piece_y, image=self._pieces_dict['p'], anchor=NW)
-            elif piece_num > 15 and piece_num <= 23: 
-                # White pawns
-                piece_y = 6 * self._square_size
-                img_id = self._canvas.create_image(piece_x, piece_y, image=self._pieces_dict['P'], anchor=NW)
-            elif piece_num > 23: 
-                # White pieces, that are not pawns
-                piece = self._w_piece_order[piece_num % 8]
-                piece_y = 7 * self._square_size
-                img_id = self._canvas.create_image(piece_x, piece_y, image=piece, anchor=NW)
-
-            # Bind chess piece image to on-click event
-            self._canvas.tag_bind(img_id, "<Button-1>", self.on_click_img)
+        self.draw_pieces()
         # Display player turn text
         self.display_text(f"Player Turn: {self._game.get_player_turn()}")
         # Hide opposing chess pieces
         self.toggle_pieces()
 
+    def redraw_pieces(self):
+        """
+        Replaces every chess piece image to match the game board.
+        """
+        self.clear_move_info()
+        self._canvas.delete("piece")
+        self.draw_pieces()
+        self.toggle_pieces()
+
+    def draw_pieces(self):
+        """
+        Create an image for each chess piece on the game board.
+        """
+        board = self._game.get_board("all")
+        for row in range(self._board_height):
+            for col in range(self._board_width):
+                letter = board[row][col]
+                if letter not in self._pieces_dict:
+                    continue
+                piece_x = col * self._square_size
+                piece_y = row * self._square_size
+                img_id = self._canvas.create_image(piece_x, piece_y, image=self._pieces_dict[letter], anchor=NW,
+                                                   tags="piece")
+
+                # Bind chess piece image to on-click event
+                self._canvas.tag_bind(img_id, "<Button-1>", self.on_click_img)
+
     def display_text(self, text, persist=False):
         """
         Display given text on the window. If persist is true, text will 
@@ -220,7 +414,9 @@ class ChessGUI:
         self._pause = True
 
         # Display text with background
-        text_id = self._canvas.create_text(400, 400, text=text, fill="black", font=("Arial", 24, "bold"))
+        center_x = self._window_size_width // 2
+        center_y = self._window_size_height // 2
+        text_id = self._canvas.create_text(center_x, center_y, text=text, fill="black", font=("Arial", 24, "bold"))
         bbox = self._canvas.bbox(text_id)
         bg_id = self._canvas.create_rectangle(bbox, fill="white", outline="")
         self._canvas.tag_lower(bg_id, text_id)
@@ -245,12 +441,22 @@ class ChessGUI:
         """
         self._pause = value is False
 
+    def get_metrics(self):
+        """
+        Returns the game's metrics, which also record GUI timings.
+        """
+        return self._game.get_metrics()
+
+    @timed("toggle_pieces_seconds")
     def toggle_pieces(self):
         """
         Hide or reveal chess pieces based on player turn.
         """
         # Get game board
-        if self._game.get_game_state() == "UNFINISHED":
+        if self._game.get_game_state() == "UNFINISHED" and self._bot is not None:
+            # Always show the board to the human player
+            perspective = "white" if self._bot_color == "black" else "black"
+        elif self._game.get_game_state() == "UNFINISHED":
             perspective = self._game.get_player_turn()
         else:
             perspective = "all"
@@ -258,9 +464,12 @@ class ChessGUI:
         hidden_icon = self._game.get_hidden_icon()
 
         # Iterate through each square on board
+        half_square = self._square_size // 2
         for row in range(len(board)):
             for col in range(len(board[0])):
-                img_id = self._canvas.find_closest((col * 100) + 50, (row * 100) + 50)
+                square_x = (col * self._square_size) + half_square
+                square_y = (row * self._square_size) + half_square
+                img_id = self._canvas.find_closest(square_x, square_y)
                 if img_id is not None:
                     if img_id[0] > self._total_squares:
                         if board[row][col] == hidden_icon:
@@ -277,6 +486,7 @@ class ChessGUI:
         Place window on computer screen and listens for events.
         """
         self._window.mainloop()
+        self._worker.shutdown()
 
 # Run Code
 game = ChessGame()
@@ -1,7 +1,13 @@
 # Author: Anthony Sokry
 # Updated: September 2025
 
+import argparse
+import operator
+import re
+import sys
 from module.ChessPiece import *
+from module.ChessMetrics import ChessMetrics, timed
+from module.BoardGeometry import BoardGeometry
 
 
 
@@ -11,33 +17,87 @@ class ChessGame:
     for chess pieces' data. White starts first.
     """
 
-    def __init__(self):
+    def __init__(self, geometry=None, metrics=None):
         """
-        Initializes chess game with standard chess setup.
+        Takes an optional BoardGeometry and an optional ChessMetrics
+        instance as parameters. Initializes chess game with standard
+        chess setup, on an 8x8 board unless a geometry is given.
         Using ChessPiece class to represent individual chess pieces.
         White pieces are represent by "wh".
         Black pieces are represent by "blk".
         Game state starts as "UNFINISHED"
         Player turn is set to "white" since white is going first.
-        Letter map is used to help convert board location to list position.
-        Use visible_piece_pos to keep track of visible pieces.
-        """
-        self._board = [
-            [Rook("blk"), Knight("blk"), Bishop("blk"), Queen("blk"), King("blk"), Bishop("blk"), Knight("blk"), Rook("blk")],
-            [Pawn("blk"), Pawn("blk"), Pawn("blk"), Pawn("blk"), Pawn("blk"), Pawn("blk"), Pawn("blk"), Pawn("blk")],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [' ', ' ', ' ', ' ', ' ', ' ', ' ', ' '],
-            [Pawn("wh"), Pawn("wh"), Pawn("wh"), Pawn("wh"), Pawn("wh"), Pawn("wh"), Pawn("wh"), Pawn("wh")],
-            [Rook("wh"), Knight("wh"), Bishop("wh"), Queen("wh"), King("wh"), Bishop("wh"), Knight("wh"), Rook("wh")]]
-
-        self._letter_map = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5, 'g': 6, 'h': 7}
+        Geometry is used to help convert board location to list position.
+        Use visible_pos to keep track of pieces visible to each color,
+        and attacked_pos and attackers to keep track of attack maps.
+        Legal targets are cached for each color until the next move.
+        Move history records every move as a pair of square indices.
+        Belief trackers are only created if belief tracking is enabled.
+        Metrics record timings of the engine's hot paths.
+        """
+        self._geometry = geometry if geometry is not None else BoardGeometry()
+        self._board = self.create_board()
+
         self._game_state = "UNFINISHED"
         self._player_turn = "white"
         self._hidden_icon = '?'
-        self._visible_piece_pos = []
+        self._visible_pos = {"white": frozenset(), "black": frozenset()}
+        self._attacked_pos = {"white": frozenset(), "black": frozenset()}
+        self._attackers = {}
+        self._legal_targets = {}
+        self._ply = 0
+        self._move_history = []
+        self._belief_trackers = {}
         self._exit_word = "end"
+        self._exit_codes = {"UNFINISHED": 0, "WHITE_WON": 10, "BLACK_WON": 11, "FINISHED": 12}
+        self._metrics = metrics if metrics is not None else ChessMetrics()
+        self.update_visible_pieces()
+
+    def create_board(self):
+        """
+        Returns a new 2d list of chess pieces set up for the board geometry.
+        Each back rank is filled from the edges inward with rooks, knights,
+        and bishops, with the queen and king in the center. On an 8x8 board
+        this is the standard chess setup.
+        """
+        width = self._geometry.get_width()
+        height = self._geometry.get_height()
+
+        # Fill back rank from the edges inward, then place queen and king
+        back_rank = [None] * width
+        piece_cycle = (Rook, Knight, Bishop)
+        for col in range(width // 2):
+            back_rank[col] = back_rank[width - 1 - col] = piece_cycle[col % len(piece_cycle)]
+        back_rank[width // 2] = King
+        back_rank[width // 2 - 1] = Queen
+
+        board = [[' '] * width for _ in range(height)]
+        board[0] = [piece("blk") for piece in back_rank]
+        board[1] = [Pawn("blk") for _ in range(width)]
+        board[height - 2] = [Pawn("wh") for _ in range(width)]
+        board[height - 1] = [piece("wh") for piece in back_rank]
+        return board
+
+    def copy(self):
+        """
+        Returns a copy of the game that can be moved independently.
+        Pawns are copied since they track their first move. Other
+        pieces never change, so they are shared with the copy.
+        Copies do not track beliefs.
+        """
+        game = ChessGame.__new__(ChessGame)
+        game.__dict__.update(self.__dict__)
+        game._board = [[piece.copy() if type(piece) is Pawn else piece for piece in row] for row in self._board]
+        game._legal_targets = dict(self._legal_targets)
+        game._move_history = list(self._move_history)
+        game._belief_trackers = {}
+        return game
+
+    def get_geometry(self):
+        """
+        Returns the board geometry.
+        """
+        return self._geometry
 
     def get_game_state(self):
         """
@@ -45,15 +105,15 @@ class ChessGame:
         """
         return self._game_state
 
-    def is_game_over(self):
+    def is_game_over(self, is_print=True):
         """
         Returns true if the game is over, false otherwise
         """
         if self._game_state != "UNFINISHED":
-            print("Game is over. " + self._game_state)
+            if is_print: print("Game is over. " + self._game_state)
         return self._game_state != "UNFINISHED"
 
-    def is_king_captured(self, pos):
+    def is_king_captured(self, pos, is_print=True):
         """
         Takes a position as parameter. Returns true if a king was captured
         at the position is captured. If true, update game state to who has won
@@ -65,7 +125,7 @@ class ChessGame:
                     self._game_state = "BLACK_WON"
                 elif piece.get_color() == "black":
                     self._game_state = "WHITE_WON"
-                print(self._game_state)
+                if is_print: print(self._game_state)
                 return True
         return False
 
@@ -79,19 +139,75 @@ class ChessGame:
             else:
                 self._player_turn = "white"
 
+    def get_metrics(self):
+        """
+        Returns the metrics used to record the engine's timings.
+        """
+        return self._metrics
+
+    def get_ply(self):
+        """
+        Returns the number of moves made so far.
+        """
+        return self._ply
+
+    def get_move_history(self):
+        """
+        Returns the moves made so far as pairs of square indices,
+        which can be replayed on a new game with apply_moves.
+        """
+        return self._move_history
+
+    def enable_belief_tracking(self):
+        """
+        Starts tracking each player's belief about the opponent's hidden
+        pieces. Beliefs are updated after every move. Must be called
+        before the first move, since the starting position is the only
+        one both players fully know. Requires NumPy.
+        """
+        # Imported here so NumPy is only needed when beliefs are tracked
+        from module.BeliefTracker import BeliefTracker
+        self._belief_trackers = {color: BeliefTracker(self, color) for color in ("white", "black")}
+
+    def get_belief(self, color):
+        """
+        Takes a color as a parameter.
+        Returns the player's belief array of piece type x square,
+        or None if belief tracking is not enabled.
+        """
+        tracker = self._belief_trackers.get(color.lower())
+        if tracker is None:
+            return None
+        return tracker.get_belief()
+
+    def get_belief_tracker(self, color):
+        """
+        Takes a color as a parameter.
+        Returns the player's belief tracker, or None if belief tracking is not enabled.
+        """
+        return self._belief_trackers.get(color.lower())
+
+    def update_beliefs(self):
+        """
+        Updates each player's belief after a move, if belief tracking is enabled.
+        """
+        for tracker in self._belief_trackers.values():
+            tracker.update()
+
     def get_player_turn(self):
         """
         Returns the current player turn
         """
         return self._player_turn
 
+    @timed("get_board_seconds")
     def get_board(self, perspective):
         """
         Takes a perspective as a parameter.
         Returns the game board as a 2d list of strings,
         displaying the board from the indicated perspective.
-        Uses data member visible_piece_pos to reveal any
-        pieces that are within capture distance of another piece.
+        Uses data member visible_pos to reveal any pieces
+        that are within capture distance of the perspective's pieces.
         """
         # Check if perspective is valid
         valid_perspectives = ["all", "white", "black"]
@@ -100,14 +216,19 @@ class ChessGame:
             print("Invalid perspective")
             return None
 
+        # Get positions visible to the perspective
+        visible_pos = self._visible_pos.get(perspective, ())
+
         # Make a copy of current board
         board_copy = [arr[:] for arr in self._board]
         # Loop through all positions on board
         row, col = 0, 0
-        while row < len(self._board):
+        row_len = self._geometry.get_height()
+        col_len = self._geometry.get_width()
+        while row < row_len:
             piece = self._board[row][col]  # Get piece at list position
             is_all = perspective == "all"  # Check if perspective is all
-            is_visible = (row, col) in self._visible_piece_pos  # Check if piece pos is visible
+            is_visible = (row, col) in visible_pos  # Check if piece pos is visible
             if type(piece) is not str:  # Check piece is not empty
                 is_same_color = perspective == piece.get_color()  # Check if piece is same color as perspective
                 if is_same_color or is_all or is_visible:
@@ -117,7 +238,7 @@ class ChessGame:
 
             # Increment to next board position
             col += 1
-            if col > len(self._board) - 1:
+            if col > col_len - 1:
                 col = 0
                 row += 1
 
@@ -128,9 +249,16 @@ class ChessGame:
         Takes a perspective as a parameter.
         Prints the board with a line break after each row.
         """
-        for section in self.get_board(perspective):
-            print(section)
-        print('')
+        print(self.format_board(perspective), end='')
+
+    def format_board(self, perspective):
+        """
+        Takes a perspective as a parameter.
+        Returns the board as printed by print_board, as a single string
+        so it can be written all at once.
+        """
+        rows = [str(section) for section in self.get_board(perspective)]
+        return '\n'.join(rows) + '\n\n'
 
     def get_hidden_icon(self):
         """
@@ -138,60 +266,144 @@ class ChessGame:
         """
         return self._hidden_icon
 
-    def make_move(self, move_from, move_to):
+    @timed("make_move_seconds")
+    def make_move(self, move_from, move_to, is_print=True):
         """
         Takes two board locations as parameters.
         Move a piece on the board from first position to second position.
         """
         # Check if the game is over
-        if self.is_game_over():
+        if self.is_game_over(is_print):
             return False
 
         # Check if board locations are valid
         func = self.is_valid_location
         if func(move_from) is False or func(move_to) is False:
-            print("Invalid board locations")
+            if is_print: print("Invalid board locations")
             return False
 
         # Convert locations to list positions
         piece_pos = self.location_to_list_pos(move_from)
         target_pos = self.location_to_list_pos(move_to)
-        piece = self.get_piece_at(piece_pos)
 
         # Check if the positions are on the board
         func = self.is_valid_position
         if func(piece_pos) is False or func(target_pos) is False:
-            print("Position is out of bounds")
+            if is_print: print("Position is out of bounds")
             return False
+        piece = self.get_piece_at(piece_pos)
 
         # Check if piece is a valid piece
-        if self.is_valid_piece(piece_pos, piece) is False:
+        if self.is_valid_piece(piece_pos, piece, is_print) is False:
             return False
 
         # Check if piece can move to target_pos
-        if self.is_valid_move(piece, piece_pos, target_pos) is False:
+        if self.is_valid_move(piece, piece_pos, target_pos, is_print) is False:
             return False
 
+        piece_name = piece.get_ful_name()
+        if is_print: print(f'{piece_name} {move_from} to {move_to}')
+
+        # Move piece and update game state
+        self.play_move(piece, piece_pos, target_pos, is_print)
+
+        # Keep track of any visible pieces
+        self.update_visible_pieces()
+        self.update_beliefs()
+
+        return True
+
+    @timed("apply_moves_seconds")
+    def apply_moves(self, moves, validate=True):
+        """
+        Takes a sequence of moves and a validate flag as parameters.
+        Each move is a pair of square indices, as returned by the
+        geometry's pos_to_square method. A NumPy array of shape (n, 2)
+        may be used as well. Moves are applied in order without printing,
+        and visible pieces are updated once after the last move, or after
+        every move if belief tracking is enabled.
+        If validate is true, each move is checked the same way make_move
+        checks it, and squares that are not integers, such as floats, are illegal.
+        Otherwise moves are trusted and applied directly.
+        Returns the index of the first illegal move, which is not applied
+        along with any moves after it, or None if every move was applied.
+        """
+        # Convert arrays to lists of ints for faster indexing
+        if hasattr(moves, "tolist"):
+            moves = moves.tolist()
+
+        total_squares = self._geometry.get_total_squares()
+        width = self._geometry.get_width()
+        illegal_index = None
+        for index, (square_from, square_to) in enumerate(moves):
+            # No moves can be made once the game is over
+            if self._game_state != "UNFINISHED":
+                illegal_index = index
+                break
+
+            if validate:
+                # Check if the squares are integers, including NumPy integers, on the board
+                try:
+                    square_from = operator.index(square_from)
+                    square_to = operator.index(square_to)
+                except TypeError:
+                    illegal_index = index
+                    break
+                if not (0 <= square_from < total_squares and 0 <= square_to < total_squares):
+                    illegal_index = index
+                    break
+                piece_pos = divmod(square_from, width)
+                target_pos = divmod(square_to, width)
+                piece = self.get_piece_at(piece_pos)
+                # Check if piece is valid and can move to target_pos
+                if self.is_valid_piece(piece_pos, piece, False) is False or \
+                        self.is_valid_move(piece, piece_pos, target_pos, False) is False:
+                    illegal_index = index
+                    break
+            else:
+                piece_pos = divmod(square_from, width)
+                target_pos = divmod(square_to, width)
+                piece = self.get_piece_at(piece_pos)
+
+            self.play_move(piece, piece_pos, target_pos, False)
+
+            # Beliefs are updated from each player's view after every move
+            if self._belief_trackers:
+                self.update_visible_pieces()
+                self.update_beliefs()
+
+        # Keep track of any visible pieces, unless beliefs already did after the last move
+        if not self._belief_trackers:
+            self.update_visible_pieces()
+
+        return illegal_index
+
+    def play_move(self, piece, piece_pos, target_pos, is_print=True):
+        """
+        Takes a piece and two list positions as parameters.
+        Moves the piece from piece_pos to target_pos without validation,
+        then updates the game state and player turn.
+        Visible pieces are not updated.
+        """
         # If Pawn is moving for the first time, disable first_move boolean
         if type(piece) is Pawn:
             if piece.is_first_move():
                 piece.disable_first_move()
 
-        piece_name = piece.get_ful_name()
-        print(f'{piece_name} {move_from} to {move_to}')
-
         # Check if a King was captured
-        if self.is_king_captured(target_pos) is False:
+        if self.is_king_captured(target_pos, is_print) is False:
             # Switch player turns if a king was not captured
             self.switch_turn()
 
         # Update piece's position on board
         self.update_board(piece, piece_pos, target_pos)
 
-        # Keep track of any visible pieces
-        self.update_visible_pieces()
-
-        return True
+        # Record move and compute legal targets again for the new ply
+        square_from = self._geometry.pos_to_square(piece_pos)
+        square_to = self._geometry.pos_to_square(target_pos)
+        self._move_history.append((square_from, square_to))
+        self._ply += 1
+        self._legal_targets = {}
 
     def get_piece_at(self, pos):
         """
@@ -213,46 +425,34 @@ class ChessGame:
         Converts the chess board location to a 2d list position
         Example: 'b2' -> [6][1]
         """
-        location = location.lower()
-        row = len(self._board) - int(location[1])
-        col = self._letter_map[location[0]]
-        return row, col
+        return self._geometry.location_to_pos(location)
 
     def is_valid_location(self, location):
         """
         Takes a board location as a parameter.
-        Returns true if board location is only two characters
-        and starts with a board letter and ends with a number.
+        Returns true if board location starts with a board letter
+        and ends with a number.
         """
-        location = location.lower()
-        is_two_chars = len(location) == 2  # Check if location is only two characters
-        board_letters = self._letter_map.keys()
-
-        # Check if location starts with a board letter and ends with a number
-        first_char_is_letter = location[0] in board_letters
-        second_char_is_int = location[1].isnumeric()
-
-        return is_two_chars and first_char_is_letter and second_char_is_int
+        return self._geometry.is_valid_location(location)
 
     def is_valid_position(self, pos):
         """
         Takes a list position as parameter.
         Returns true if the position is within the board.
         """
-        col_len = row_len = len(self._board)
-        return 0 <= pos[0] < row_len and 0 <= pos[1] < col_len
+        return self._geometry.is_on_board(pos)
 
-    def is_valid_piece(self, piece_pos, piece):
+    def is_valid_piece(self, piece_pos, piece, is_print=True):
         """
         Takes a position and chess piece as a parameter.
         Returns true if the piece exists at the given position
         and belongs to the current player.
         """
         if type(piece) is str:
-            print("Piece does not exist at " + piece_pos)
+            if is_print: print(f"Piece does not exist at {self._geometry.pos_to_location(piece_pos)}")
             return False
         if piece.get_color() != self._player_turn:
-            print("Piece does not belong to current Player")
+            if is_print: print("Piece does not belong to current Player")
             return False
         return True
 
@@ -261,6 +461,9 @@ class ChessGame:
         Takes a piece and two positions as parameters.
         Returns true if the piece is able to move to target position
         """
+        # Only counted, since timing every candidate move costs more than the check
+        self._metrics.increment("is_valid_move_calls")
+
         # Check if piece is trying to move in place
         if piece_pos == target_pos:
             if is_print: print("Piece cannot move in place")
@@ -306,7 +509,7 @@ class ChessGame:
 
         # Check if piece can move to target_pos
         if valid_dist is False:
-            if print: print("Piece cannot move to target position")
+            if is_print: print("Piece cannot move to target position")
             return False
 
         # If piece is Knight, exit out of method.
@@ -332,49 +535,176 @@ class ChessGame:
         self.set_piece_at(target_pos, piece)
         self.set_piece_at(piece_pos, ' ')
 
+    def is_visible(self, pos, perspective):
+        """
+        Takes a list position and a perspective as parameters.
+        Returns true if the contents of the position are shown
+        when the board is displayed from the given perspective.
+        """
+        perspective = perspective.lower()
+        if perspective == "all":
+            return True
+        piece = self.get_piece_at(pos)
+        if type(piece) is str or piece.get_color() == perspective:
+            return True
+        return pos in self._visible_pos.get(perspective, ())
+
+    def attacked_by(self, color):
+        """
+        Takes a color as a parameter.
+        Returns the set of list positions that pieces of
+        the given color are able to capture on. Positions held
+        by the given color are not included, even if defended.
+        """
+        return self._attacked_pos.get(color.lower(), frozenset())
+
+    def attackers_of(self, pos):
+        """
+        Takes a list position as a parameter.
+        Returns the list positions of every piece,
+        of either color, that is able to capture on it. Pieces
+        of the same color as a piece standing on the position
+        only defend it and are not included.
+        """
+        return self._attackers.get(pos, ())
+
+    def get_legal_targets(self, pos):
+        """
+        Takes a list position as a parameter.
+        Returns the set of list positions that the piece at
+        the given position can move to, or an empty set
+        if the position is empty.
+        """
+        piece = self.get_piece_at(pos)
+        if type(piece) is str:
+            return frozenset()
+        return self.get_all_legal_targets(piece.get_color()).get(pos, frozenset())
+
+    def get_all_legal_targets(self, color):
+        """
+        Takes a color as a parameter.
+        Returns a map of the list position of each piece of
+        the given color to the set of positions it can move to.
+        Targets are computed once per ply and cached.
+        """
+        color = color.lower()
+        legal_targets = self._legal_targets.get(color)
+        if legal_targets is None:
+            legal_targets = self.find_legal_targets(color)
+            self._legal_targets[color] = legal_targets
+        return legal_targets
+
+    @timed("find_legal_targets_seconds")
+    def find_legal_targets(self, color):
+        """
+        Takes a color as a parameter.
+        Returns a map of the list position of each piece of
+        the given color to the set of positions it can move to.
+        Candidate positions follow each piece's rays and are
+        confirmed with is_valid_move.
+        """
+        legal_targets = {}
+        row_len = self._geometry.get_height()
+        col_len = self._geometry.get_width()
+        for list_row in range(row_len):
+            for list_col in range(col_len):
+                piece_pos = list_row, list_col
+                piece = self.get_piece_at(piece_pos)
+                if type(piece) is str or piece.get_color() != color:
+                    continue
+
+                # Collect positions along each capture ray up to the first piece
+                candidates = []
+                for dist_vals in piece.get_capture_dist().values():
+                    for dist in dist_vals:
+                        target_pos = piece_pos[0] - dist[0], piece_pos[1] - dist[1]
+                        while self.is_valid_position(target_pos):
+                            candidates.append(target_pos)
+                            if type(self.get_piece_at(target_pos)) is not str or piece.is_sliding() is False:
+                                break
+                            target_pos = target_pos[0] - dist[0], target_pos[1] - dist[1]
+
+                # Pawns also move forward without capturing
+                if type(piece) is Pawn:
+                    for dist_vals in piece.get_move_dist().values():
+                        for dist in dist_vals:
+                            target_pos = piece_pos[0] - dist[0], piece_pos[1] - dist[1]
+                            if self.is_valid_position(target_pos):
+                                candidates.append(target_pos)
+
+                legal_targets[piece_pos] = frozenset(
+                    target_pos for target_pos in candidates
+                    if self.is_valid_move(piece, piece_pos, target_pos, False))
+        return legal_targets
+
+    @timed("update_visible_pieces_seconds")
     def update_visible_pieces(self):
         """
-        Add any position of pieces that are within
-        capture distance of any other piece to list
-        of visible pieces. List of visible pieces will
+        Rebuilds the attack map and the visible positions of each color.
+        A position is attacked by a piece if the piece could capture
+        there, so positions held by the piece's own color are never
+        attacked by it, and an enemy piece is visible to a color if it stands on
+        a position attacked by that color. Visible positions will
         be used to expose specific pieces on board
         when get_board method is called.
         """
-        # Reset list of visible piece positions
-        self._visible_piece_pos.clear()
+        # Reset attack maps and visible piece positions
+        visible_pos = {"white": set(), "black": set()}
+        attacked_pos = {"white": set(), "black": set()}
+        attackers = {}
+        positions_scanned = 0
         # Loop through entire board positions
         list_row, list_col = 0, 0
-        col_len = row_len = len(self._board[0])
+        row_len = self._geometry.get_height()
+        col_len = self._geometry.get_width()
         while list_row < row_len:
             piece_pos = list_row, list_col
             piece = self.get_piece_at(piece_pos)
             if type(piece) is not str:  # Check chess piece is not empty
+                color = piece.get_color()
                 # Get list of capture distances of piece
                 capture_dist = piece.get_capture_dist()
+                sliding = piece.is_sliding()
                 # Loop through each of the piece's distance values
                 for dist_vals in capture_dist.values():
                     for dist in dist_vals:
                         # Get the target position relative to piece's current position
-                        target_col = piece_pos[1] - dist[1]
-                        target_row = piece_pos[0] - dist[0]
-                        target_pos = target_row, target_col
-                        # Check if target position is within the board
-                        if self.is_valid_position(target_pos):
+                        target_pos = piece_pos[0] - dist[0], piece_pos[1] - dist[1]
+                        # Follow the ray while target position is within the board
+                        while self.is_valid_position(target_pos):
+                            positions_scanned += 1
                             target = self.get_piece_at(target_pos)
-                            # Check if target is not empty and is an enemy
-                            if type(target) is not str and target.get_color() != piece.get_color():
-                                # Check if piece can potentially capture target
-                                if self.is_valid_move(piece, piece_pos, target_pos, False):
-                                    # Check if target position is not in list of visible piece positions
-                                    if target_pos not in self._visible_piece_pos:
-                                        # Add target position to list of visible piece positions
-                                        self._visible_piece_pos.append(target_pos)
+                            # Check if target is not empty, the first piece blocks the ray
+                            if type(target) is not str:
+                                # Check if target is an enemy, pieces of the same color are not attacked
+                                if target.get_color() != color:
+                                    # Piece is able to capture the target and can see it
+                                    attacked_pos[color].add(target_pos)
+                                    attackers.setdefault(target_pos, []).append(piece_pos)
+                                    visible_pos[color].add(target_pos)
+                                break
+                            # Piece is able to capture on the empty target position
+                            attacked_pos[color].add(target_pos)
+                            attackers.setdefault(target_pos, []).append(piece_pos)
+                            # Non-sliding pieces only reach the first position
+                            if sliding is False:
+                                break
+                            target_pos = target_pos[0] - dist[0], target_pos[1] - dist[1]
             # Increment to next board position
             list_col += 1
             if list_col > col_len - 1:
                 list_col = 0
                 list_row += 1
 
+        # Freeze maps so they can be shared by queries without copying
+        self._visible_pos = {color: frozenset(pos) for color, pos in visible_pos.items()}
+        self._attacked_pos = {color: frozenset(pos) for color, pos in attacked_pos.items()}
+        self._attackers = {pos: tuple(attacker) for pos, attacker in attackers.items()}
+
+        # Record how many positions were checked during this update
+        if self._metrics.is_enabled():
+            self._metrics.record("update_visible_pieces_positions_scanned", positions_scanned)
+
     def play_terminal(self):
         """
         Starts chess game in terminal. Player inputs two standard chess 
@@ -396,7 +726,7 @@ class ChessGame:
                 break
 
             # Separate locations
-            locations = player_input.split(", ")
+            locations = self.parse_locations(player_input)
             if len(locations) != 2:
                 print("Invalid Input, try inputting two chess locations separated by a comma.")
                 print("Example: d2, d4")
@@ -420,6 +750,68 @@ class ChessGame:
                 print("<--- " + self.get_player_turn().upper() + " Turn" + " --->")
                 self.print_board(self._player_turn)
     
+    def parse_locations(self, text):
+        """
+        Takes a line of input as a parameter.
+        Returns the list of words in the line, where words
+        are separated by commas, spaces, or both.
+        Example: 'd2, d4' -> ['d2', 'd4']
+        """
+        return [word for word in re.split(r"[,\s]+", text.strip()) if word]
+
+    def play_script(self, lines, output="every", out=None, strict=False):
+        """
+        Takes an iterable of input lines, an output level, an output stream,
+        and a strict flag as parameters. Plays the game without prompting,
+        using one move per line in the same format as play_terminal. Blank
+        lines and lines starting with '#' are skipped, and the exit word
+        ends the game. Output levels are "quiet" for no output, "final" for
+        the final board, and "every" for the board after every move. Each
+        board is written to the output stream, stdout by default, with a
+        single write. Invalid moves are reported on stderr unless the output
+        level is "quiet", so they never mix with the boards. If strict is
+        true, play stops at the first invalid move.
+        Returns the exit code of the game result.
+        """
+        out = out if out is not None else sys.stdout
+        for line_num, line in enumerate(lines, 1):
+            if self._game_state != "UNFINISHED":
+                break
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            locations = self.parse_locations(line)
+            if self._exit_word in locations:
+                self._game_state = "FINISHED"
+                break
+
+            # Attempt to make move
+            if len(locations) != 2 or self.make_move(locations[0], locations[1], False) is False:
+                if output != "quiet":
+                    sys.stderr.write(f"Invalid move on line {line_num}: {line}\n")
+                if strict:
+                    out.flush()
+                    return 3
+                continue
+
+            if output == "every":
+                out.write(f"{line}\n\n<--- {self._player_turn.upper()} Turn --->\n"
+                          + self.format_board(self._player_turn))
+
+        if output != "quiet":
+            out.write(f"{self._game_state}\n\n" + self.format_board("all"))
+        out.flush()
+        return self.get_exit_code()
+
+    def get_exit_code(self):
+        """
+        Returns the process exit code for the game state:
+        0 if unfinished, 10 if white won, 11 if black won,
+        and 12 if the game was ended with the exit word.
+        """
+        return self._exit_codes[self._game_state]
+
     def exit_play(self, word):
         """
         Return true if given word is the exit word. 
@@ -435,5 +827,19 @@ class ChessGame:
 
 # Run Code
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Fog of War chess in the terminal.")
+    parser.add_argument("--moves", metavar="FILE",
+                        help="play moves from a file, one per line, or from stdin if FILE is '-'")
+    parser.add_argument("--output", choices=("quiet", "final", "every"), default="every",
+                        help="boards to write when playing moves from a file")
+    parser.add_argument("--strict", action="store_true", help="stop at the first invalid move (exit code 3)")
+    args = parser.parse_args()
+
     game = ChessGame()
-    game.play_terminal()
+    if args.moves is None:
+        game.play_terminal()
+    elif args.moves == "-":
+        sys.exit(game.play_script(sys.stdin, args.output, strict=args.strict))
+    else:
+        with open(args.moves) as moves_file:
+            sys.exit(game.play_script(moves_file, args.output, strict=args.strict))
@@ -0,0 +1,155 @@
+import numpy as np
+
+from module.ChessPiece import Pawn, Knight, Bishop, Rook, Queen, King
+
+
+class BeliefTracker:
+    """
+    Tracks one player's belief about the opponent's hidden pieces.
+    Hidden pieces are shown as '?' by get_board, so the player always
+    knows where the opponent's pieces are but not what they are. The
+    belief is a NumPy array of piece type x square, where each entry is
+    the probability that the square holds an opponent piece of that type.
+    Columns of opponent squares sum to 1 and every other column is 0.
+    """
+    def __init__(self, game, color, iterations=10):
+        """
+        Takes a chess game, the color of the player, and the number of
+        balancing iterations per update as parameters. The belief starts
+        from the game's current position, which is public knowledge before
+        the first move. Raises InvalidTrackingStartError if any moves have
+        been made, since the position would reveal hidden pieces.
+        """
+        if game.get_ply() != 0:
+            raise InvalidTrackingStartError
+        self._game = game
+        self._color = color
+        self._iterations = iterations
+        self._geometry = game.get_geometry()
+        opponent_code = "blk" if color == "white" else "wh"
+        self._piece_types = (Pawn, Knight, Bishop, Rook, Queen, King)
+        # Opponent pieces used to check which piece types could make a move
+        self._pieces = [piece_type(opponent_code) for piece_type in self._piece_types]
+        self._letters = np.array([piece.get_name() for piece in self._pieces])
+
+        # Start with every opponent piece known
+        view = self.read_view(game.get_board("all"))
+        self._belief = (view[None, :] == self._letters[:, None]).astype(float)
+        self._counts = self._belief.sum(axis=1)
+        self._occupied = self._belief.sum(axis=0) > 0
+        self._ply = game.get_ply()
+
+    def get_belief(self):
+        """
+        Returns the belief array of shape (piece types, squares).
+        Squares are numbered like the geometry's square indices.
+        """
+        return self._belief
+
+    def get_piece_names(self):
+        """
+        Returns the names of the piece types, in the order of the belief's rows.
+        """
+        return [piece_type.__name__.lower() for piece_type in self._piece_types]
+
+    def get_counts(self):
+        """
+        Returns the number of opponent pieces left of each piece type.
+        """
+        return self._counts
+
+    def read_view(self, board):
+        """
+        Takes a board, as returned by get_board, as a parameter.
+        Returns its icons as a flat array in square index order.
+        """
+        return np.array(board, dtype="<U1").ravel()
+
+    def get_move_mask(self, dist):
+        """
+        Takes the distance of an opponent move as a parameter.
+        Returns an array that is 1 for each piece type that could
+        make the move and 0 otherwise.
+        """
+        mask = np.zeros(len(self._pieces))
+        for index, piece in enumerate(self._pieces):
+            if type(piece) is Pawn:
+                is_valid = piece.is_valid_distance(dist) or piece.is_valid_distance(dist, False)
+            else:
+                is_valid = piece.is_valid_distance(dist)
+            mask[index] = is_valid
+        return mask
+
+    def update(self):
+        """
+        Updates the belief from the player's view of the board after
+        the latest move. Opponent moves carry the belief of the moved
+        piece to its new square, keeping only piece types that could
+        make the move. Captures by the player remove the captured piece
+        from the counts. Pieces the player can see are known exactly, and
+        the rest of the belief is balanced so each piece type's row adds
+        up to the number of those pieces the opponent has left.
+        """
+        if self._game.get_ply() == self._ply:
+            return
+        self._ply = self._game.get_ply()
+
+        view = self.read_view(self._game.get_board(self._color))
+        known = view[None, :] == self._letters[:, None]
+        is_known = known.any(axis=0)
+        occupied = (view == self._game.get_hidden_icon()) | is_known
+        vacated = np.flatnonzero(self._occupied & ~occupied)
+        arrived = np.flatnonzero(occupied & ~self._occupied)
+        belief = self._belief
+
+        last_move = self._game.get_move_history()[-1]
+        mover = self._game.get_piece_at(self._geometry.square_to_pos(last_move[1])).get_color()
+        if mover == self._color:
+            # Opponent pieces the player captured
+            self._counts = self._counts - belief[:, vacated].sum(axis=1)
+        elif len(vacated) == 1 and len(arrived) == 1:
+            # Carry the moved piece's belief to its new square
+            from_row, from_col = self._geometry.square_to_pos(vacated[0])
+            to_row, to_col = self._geometry.square_to_pos(arrived[0])
+            column = belief[:, vacated[0]] * self.get_move_mask((from_row - to_row, from_col - to_col))
+            if column.sum() == 0:
+                column = belief[:, vacated[0]]
+            belief[:, arrived[0]] = column / column.sum()
+        else:
+            # Spread unexplained pieces over the piece types left
+            belief[:, arrived] = self._counts[:, None] / max(self._counts.sum(), 1)
+
+        # Visible pieces are known and empty or own squares hold no opponent piece
+        belief[:, is_known] = known[:, is_known]
+        belief[:, ~occupied] = 0
+        self._occupied = occupied
+        self.balance(known, occupied & ~is_known)
+
+    def balance(self, known, unknown):
+        """
+        Takes the known piece array and a mask of squares with hidden pieces
+        as parameters. Alternately scales the hidden squares' rows to the
+        piece counts that are not visible and their columns to 1.
+        """
+        targets = np.clip(self._counts - known.sum(axis=1), 0, None)
+        hidden = self._belief[:, unknown]
+        for _ in range(self._iterations):
+            row_sums = hidden.sum(axis=1)
+            hidden *= np.divide(targets, row_sums, out=np.zeros_like(targets), where=row_sums > 0)[:, None]
+            column_sums = hidden.sum(axis=0)
+            hidden /= np.where(column_sums > 0, column_sums, 1)[None, :]
+
+        # Hidden pieces that no piece type fits share the piece types left
+        empty = hidden.sum(axis=0) == 0
+        if empty.any() and targets.sum() > 0:
+            hidden[:, empty] = (targets / targets.sum())[:, None]
+        self._belief[:, unknown] = hidden
+
+
+class InvalidTrackingStartError(Exception):
+    """
+    Exception for starting belief tracking after the first move.
+    Beliefs must start from the starting position, which both
+    players know, so no hidden pieces are revealed.
+    """
+    pass
@@ -0,0 +1,114 @@
+class BoardGeometry:
+    """
+    Represents the size of a chess board and converts between
+    board locations, such as 'b2', and 2d list positions.
+    Columns are lettered from 'a' and rows are numbered from 1,
+    starting at the bottom of the board.
+    """
+    def __init__(self, width=8, height=8):
+        """
+        Takes a board width and a board height as parameters.
+        Width is limited to the 26 column letters and height
+        must leave room for both players' back ranks and pawns.
+        """
+        if not 2 <= width <= 26 or height < 4:
+            raise InvalidBoardSizeError
+
+        self._width = width
+        self._height = height
+        self._letter_map = {chr(ord('a') + col): col for col in range(width)}
+
+    def get_width(self):
+        """
+        Returns the number of columns on the board.
+        """
+        return self._width
+
+    def get_height(self):
+        """
+        Returns the number of rows on the board.
+        """
+        return self._height
+
+    def get_total_squares(self):
+        """
+        Returns the number of squares on the board.
+        """
+        return self._width * self._height
+
+    def get_letter_map(self):
+        """
+        Returns the map of column letters to list columns.
+        """
+        return self._letter_map
+
+    def is_on_board(self, pos):
+        """
+        Takes a list position as a parameter.
+        Returns true if the position is within the board.
+        """
+        return 0 <= pos[0] < self._height and 0 <= pos[1] < self._width
+
+    def is_valid_location(self, location):
+        """
+        Takes a board location as a parameter.
+        Returns true if board location starts with a board letter
+        and ends with a number. Rows may have more than one digit.
+        """
+        location = location.lower()
+        if len(location) < 2:
+            return False
+        # Only ASCII digits, since int() rejects other numeric characters like '²'
+        rank = location[1:]
+        return location[0] in self._letter_map and rank.isascii() and rank.isdecimal()
+
+    def location_to_pos(self, location):
+        """
+        Takes a board location as a parameter.
+        Converts the board location to a 2d list position.
+        Example: 'b2' -> (6, 1) on an 8x8 board
+        """
+        location = location.lower()
+        row = self._height - int(location[1:])
+        col = self._letter_map[location[0]]
+        return row, col
+
+    def pos_to_location(self, pos):
+        """
+        Takes a 2d list position as a parameter.
+        Converts the list position to a board location.
+        Example: (6, 1) -> 'b2' on an 8x8 board
+        """
+        return chr(ord('a') + pos[1]) + str(self._height - pos[0])
+
+    def pos_to_square(self, pos):
+        """
+        Takes a 2d list position as a parameter.
+        Returns the square index of the position, counting
+        from the top left of the board one row at a time.
+        Example: (6, 1) -> 49 on an 8x8 board
+        """
+        return pos[0] * self._width + pos[1]
+
+    def square_to_pos(self, square):
+        """
+        Takes a square index as a parameter.
+        Returns the 2d list position of the square.
+        Example: 49 -> (6, 1) on an 8x8 board
+        """
+        return divmod(square, self._width)
+
+    def location_to_square(self, location):
+        """
+        Takes a board location as a parameter.
+        Returns the square index of the location.
+        """
+        return self.pos_to_square(self.location_to_pos(location))
+
+
+class InvalidBoardSizeError(Exception):
+    """
+    Exception for invalid board size.
+    Board width must be between 2 and 26 and height must be at least 4.
+    """
+    pass
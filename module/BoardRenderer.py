@@ -0,0 +1,369 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from ChessGame import ChessGame
+from module.BoardGeometry import BoardGeometry
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Decoded sprites shared by every renderer in the process
+_sprite_cache = {}
+
+# Renderer used by each worker process of render_archive
+_worker_renderer = None
+
+
+class BoardRenderer:
+    """
+    Renders chess boards to PNG images without Tk, using the same
+    sprites as the GUI. Each square image is blended once per
+    square size and cached, so a frame is built by joining cached
+    rows of pixels instead of compositing every pixel.
+    """
+    def __init__(self, square_size=100, asset_dir=ASSET_DIR, compress_level=3):
+        """
+        Takes a square size in pixels, the asset directory, and a zlib
+        compression level as parameters. Sprites are scaled to the square
+        size, so small square sizes can be used for thumbnails.
+        """
+        self._square_size = square_size
+        self._asset_dir = asset_dir
+        self._compress_level = compress_level
+        self._light_square = "light-brown-square.png"
+        self._dark_square = "brown-square.png"
+        self._sprite_files = {
+            'p': "black_pieces/b_p.png", 'r': "black_pieces/b_r.png", 'n': "black_pieces/b_n.png",
+            'b': "black_pieces/b_b.png", 'q': "black_pieces/b_q.png", 'k': "black_pieces/b_k.png",
+            'P': "white_pieces/w_p.png", 'R': "white_pieces/w_r.png", 'N': "white_pieces/w_n.png",
+            'B': "white_pieces/w_b.png", 'Q': "white_pieces/w_q.png", 'K': "white_pieces/w_k.png",
+            '?': "hidden.png"
+        }
+        self._tiles = {}
+
+    def get_square_size(self):
+        """
+        Returns the size of a square in pixels.
+        """
+        return self._square_size
+
+    def get_tile(self, is_dark, icon):
+        """
+        Takes a square shade and a board icon, as returned by get_board,
+        as parameters. Returns the square image as a list of RGB pixel rows.
+        """
+        key = (is_dark, icon)
+        tile = self._tiles.get(key)
+        if tile is None:
+            square_file = self._dark_square if is_dark else self._light_square
+            tile = self.blend(self.load_sprite(square_file), self.load_sprite(self._sprite_files.get(icon)))
+            self._tiles[key] = tile
+        return tile
+
+    def load_sprite(self, file_name):
+        """
+        Takes a sprite file name, relative to the asset directory, as a
+        parameter. Returns the decoded sprite, or None if there is no file.
+        """
+        if file_name is None:
+            return None
+        path = os.path.join(self._asset_dir, file_name)
+        sprite = _sprite_cache.get(path)
+        if sprite is None:
+            sprite = read_png(path)
+            _sprite_cache[path] = sprite
+        return sprite
+
+    def blend(self, square, sprite):
+        """
+        Takes a square sprite and an optional piece sprite as parameters.
+        Scales both to the square size and draws the piece over the square.
+        Returns the result as a list of RGB pixel rows.
+        """
+        size = self._square_size
+        rows = []
+        for y in range(size):
+            row = bytearray(size * 3)
+            square_row = square[2][y * square[1] // size]
+            sprite_row = sprite[2][y * sprite[1] // size] if sprite is not None else None
+            for x in range(size):
+                base = (x * square[0] // size) * 4
+                red, green, blue = square_row[base], square_row[base + 1], square_row[base + 2]
+                if sprite_row is not None:
+                    top = (x * sprite[0] // size) * 4
+                    alpha = sprite_row[top + 3]
+                    red = (sprite_row[top] * alpha + red * (255 - alpha) + 127) // 255
+                    green = (sprite_row[top + 1] * alpha + green * (255 - alpha) + 127) // 255
+                    blue = (sprite_row[top + 2] * alpha + blue * (255 - alpha) + 127) // 255
+                row[x * 3:x * 3 + 3] = bytes((red, green, blue))
+            rows.append(bytes(row))
+        return rows
+
+    def compose(self, board):
+        """
+        Takes a board, as returned by get_board, as a parameter.
+        Returns the board image as PNG scanlines, which are RGB
+        pixel rows that each start with a filter byte of 0.
+        """
+        scanlines = []
+        for row, icons in enumerate(board):
+            tiles = [self.get_tile((row + col) % 2 == 1, icon) for col, icon in enumerate(icons)]
+            for y in range(self._square_size):
+                scanlines.append(b"\x00")
+                scanlines.extend(tile[y] for tile in tiles)
+        return b"".join(scanlines)
+
+    def render_board(self, board):
+        """
+        Takes a board, as returned by get_board, as a parameter.
+        Returns the board image as PNG file contents.
+        """
+        width = len(board[0]) * self._square_size
+        height = len(board) * self._square_size
+        return encode_png(width, height, zlib.compress(self.compose(board), self._compress_level))
+
+    def render_perspective(self, game, perspective):
+        """
+        Takes a chess game and a perspective as parameters.
+        Returns the board displayed from the perspective as PNG file contents.
+        """
+        return self.render_board(game.get_board(perspective))
+
+    def replay_frames(self, moves, perspective="all", geometry=None):
+        """
+        Takes a sequence of moves, as square index pairs, a perspective,
+        and an optional board geometry as parameters. Replays the moves on
+        a new game and yields the scanlines of the board before the first
+        move and after every move. The perspective "turn" shows each board
+        from the view of the player about to move. Replay stops at the
+        first illegal move.
+        """
+        game = ChessGame(geometry)
+        yield self.compose(game.get_board(self.get_view(game, perspective)))
+        for move in moves:
+            if game.apply_moves((move,)) is not None:
+                return
+            yield self.compose(game.get_board(self.get_view(game, perspective)))
+
+    def render_replay(self, moves, perspective="all", geometry=None):
+        """
+        Takes a sequence of moves, a perspective, and an optional board
+        geometry as parameters. Returns a list with a PNG image of the
+        board before the first move and after every move.
+        """
+        geometry = geometry if geometry is not None else BoardGeometry()
+        width = geometry.get_width() * self._square_size
+        height = geometry.get_height() * self._square_size
+        return [encode_png(width, height, zlib.compress(frame, self._compress_level))
+                for frame in self.replay_frames(moves, perspective, geometry)]
+
+    def render_animation(self, moves, perspective="all", geometry=None, delay=500):
+        """
+        Takes a sequence of moves, a perspective, an optional board
+        geometry, and a frame delay in milliseconds as parameters.
+        Returns an animated PNG of the replayed game.
+        """
+        geometry = geometry if geometry is not None else BoardGeometry()
+        width = geometry.get_width() * self._square_size
+        height = geometry.get_height() * self._square_size
+        frames = [zlib.compress(frame, self._compress_level)
+                  for frame in self.replay_frames(moves, perspective, geometry)]
+        return encode_apng(width, height, frames, delay)
+
+    def render_final(self, moves, perspective="all", geometry=None):
+        """
+        Takes a sequence of moves, a perspective, and an optional board
+        geometry as parameters. Applies the moves to a new game and returns
+        a PNG image of the board once the moves stop or become illegal.
+        """
+        game = ChessGame(geometry)
+        game.apply_moves(moves)
+        return self.render_perspective(game, self.get_view(game, perspective))
+
+    def get_view(self, game, perspective):
+        """
+        Takes a chess game and a perspective as parameters.
+        Returns the perspective, replacing "turn" with the player to
+        move, or "all" once the game is over.
+        """
+        if perspective != "turn":
+            return perspective
+        if game.get_game_state() != "UNFINISHED":
+            return "all"
+        return game.get_player_turn()
+
+
+def read_png(path):
+    """
+    Takes the path of a PNG file as a parameter. Only 8-bit,
+    non-interlaced RGB and RGBA images are supported.
+    Returns the width, the height, and a list of RGBA pixel rows.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:8] != PNG_SIGNATURE:
+        raise UnsupportedImageError
+
+    # Collect header and image data chunks
+    header = None
+    image_data = []
+    pos = 8
+    while pos < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"IDAT":
+            image_data.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+        pos += 12 + length
+
+    if header is None:
+        raise UnsupportedImageError
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or color_type not in (2, 6) or interlace != 0:
+        raise UnsupportedImageError
+
+    # Undo the filter of each row
+    channels = 4 if color_type == 6 else 3
+    stride = width * channels
+    raw = zlib.decompress(b"".join(image_data))
+    rows = []
+    prev = bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        filter_type = raw[start]
+        row = bytearray(raw[start + 1:start + 1 + stride])
+        if filter_type == 1:  # Sub
+            for i in range(channels, stride):
+                row[i] = (row[i] + row[i - channels]) & 0xff
+        elif filter_type == 2:  # Up
+            for i in range(stride):
+                row[i] = (row[i] + prev[i]) & 0xff
+        elif filter_type == 3:  # Average
+            for i in range(stride):
+                left = row[i - channels] if i >= channels else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xff
+        elif filter_type == 4:  # Paeth
+            for i in range(stride):
+                left = row[i - channels] if i >= channels else 0
+                up_left = prev[i - channels] if i >= channels else 0
+                up = prev[i]
+                estimate = left + up - up_left
+                dist_left, dist_up, dist_up_left = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+                if dist_left <= dist_up and dist_left <= dist_up_left:
+                    predictor = left
+                elif dist_up <= dist_up_left:
+                    predictor = up
+                else:
+                    predictor = up_left
+                row[i] = (row[i] + predictor) & 0xff
+        rows.append(row)
+        prev = row
+
+    # Add an opaque alpha channel to RGB images
+    if channels == 3:
+        rgba_rows = []
+        for row in rows:
+            rgba = bytearray(width * 4)
+            for x in range(width):
+                rgba[x * 4:x * 4 + 3] = row[x * 3:x * 3 + 3]
+                rgba[x * 4 + 3] = 255
+            rgba_rows.append(rgba)
+        rows = rgba_rows
+
+    return width, height, [bytes(row) for row in rows]
+
+
+def png_chunk(chunk_type, data):
+    """
+    Takes a chunk type and chunk data as parameters.
+    Returns the chunk with its length and checksum.
+    """
+    checksum = zlib.crc32(chunk_type + data) & 0xffffffff
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", checksum)
+
+
+def encode_png(width, height, compressed):
+    """
+    Takes an image width, an image height, and compressed RGB
+    scanlines as parameters. Returns the PNG file contents.
+    """
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", compressed) + png_chunk(b"IEND", b"")
+
+
+def encode_apng(width, height, frames, delay):
+    """
+    Takes an image width, an image height, a list of compressed RGB
+    scanlines, and a frame delay in milliseconds as parameters.
+    Returns the animated PNG file contents, which loop forever.
+    Viewers without animation support show the first frame.
+    """
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunks = [PNG_SIGNATURE, png_chunk(b"IHDR", header), png_chunk(b"acTL", struct.pack(">II", len(frames), 0))]
+    sequence = 0
+    for index, frame in enumerate(frames):
+        # Frame control: full size, no offset, delay in milliseconds, no disposal, no blending
+        control = struct.pack(">IIIIIHHBB", sequence, width, height, 0, 0, delay, 1000, 0, 0)
+        chunks.append(png_chunk(b"fcTL", control))
+        sequence += 1
+        if index == 0:
+            chunks.append(png_chunk(b"IDAT", frame))
+        else:
+            chunks.append(png_chunk(b"fdAT", struct.pack(">I", sequence) + frame))
+            sequence += 1
+    chunks.append(png_chunk(b"IEND", b""))
+    return b"".join(chunks)
+
+
+def render_archive(games, output_dir, perspective="all", animated=True, square_size=100, processes=None):
+    """
+    Takes an iterable of (game id, moves) pairs, an output directory,
+    a perspective, an animated flag, a square size, and a number of
+    processes as parameters. Renders each game on a pool of worker
+    processes and writes it to "<game id>.png" in the output directory,
+    as an animated replay or, if animated is false, as an image of the
+    final board. Returns the paths of the written files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = ((game_id, moves, output_dir, perspective, animated) for game_id, moves in games)
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_render_worker,
+                             initargs=(square_size,)) as executor:
+        return list(executor.map(render_archive_game, jobs, chunksize=8))
+
+
+def init_render_worker(square_size):
+    """
+    Takes a square size as a parameter.
+    Creates the renderer used by a worker process.
+    """
+    global _worker_renderer
+    _worker_renderer = BoardRenderer(square_size)
+
+
+def render_archive_game(job):
+    """
+    Takes a render_archive job as a parameter.
+    Renders the game in a worker process and returns the written path.
+    """
+    game_id, moves, output_dir, perspective, animated = job
+    if animated:
+        image = _worker_renderer.render_animation(moves, perspective)
+    else:
+        image = _worker_renderer.render_final(moves, perspective)
+    path = os.path.join(output_dir, f"{game_id}.png")
+    with open(path, "wb") as file:
+        file.write(image)
+    return path
+
+
+class UnsupportedImageError(Exception):
+    """
+    Exception for images that cannot be decoded.
+    Only 8-bit, non-interlaced RGB and RGBA PNG files are supported.
+    """
+    pass
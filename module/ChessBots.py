@@ -0,0 +1,42 @@
+import random
+
+
+def random_policy(game, color):
+    """
+    Takes a chess game and a color as parameters.
+    Returns a random legal move for the color as a pair of
+    square indices, or None if the color has no legal moves.
+
+    Move policies share this signature so they can be used
+    by the GUI as a computer opponent.
+    """
+    geometry = game.get_geometry()
+    moves = [(geometry.pos_to_square(piece_pos), geometry.pos_to_square(target_pos))
+             for piece_pos, targets in game.get_all_legal_targets(color).items()
+             for target_pos in targets]
+    if len(moves) == 0:
+        return None
+    return random.choice(sorted(moves))
+
+
+def greedy_policy(game, color):
+    """
+    Takes a chess game and a color as parameters.
+    Returns the legal move that captures the most valuable
+    visible piece, or a random legal move if nothing can be
+    captured. Moves are pairs of square indices.
+    """
+    geometry = game.get_geometry()
+    piece_values = {'p': 1, 'n': 3, 'b': 3, 'r': 5, 'q': 9, 'k': 100}
+    board = game.get_board(color)
+    best_move = None
+    best_value = 0
+    for piece_pos, targets in sorted(game.get_all_legal_targets(color).items()):
+        for target_pos in sorted(targets):
+            value = piece_values.get(board[target_pos[0]][target_pos[1]].lower(), 0)
+            if value > best_value:
+                best_move = (geometry.pos_to_square(piece_pos), geometry.pos_to_square(target_pos))
+                best_value = value
+    if best_move is None:
+        return random_policy(game, color)
+    return best_move
@@ -0,0 +1,160 @@
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+
+class ChessMetrics:
+    """
+    Collects call counts, latencies, and other measurements for the
+    chess engine's hot paths. Every measurement is stored as a series
+    that keeps a running count, sum, and max, along with a bounded
+    window of recent samples used for percentiles.
+    Recording a sample is an append and a few additions, so metrics
+    can be left enabled during normal play. Paths that run too often to
+    time, such as checking a single move, only keep a plain counter.
+    """
+    def __init__(self, enabled=True, sample_size=1024):
+        """
+        Takes an enabled flag and a sample size as parameters.
+        Sample size is the number of recent samples kept per series
+        for percentile calculations.
+        """
+        self._enabled = enabled
+        self._sample_size = sample_size
+        self._series = {}
+        self._counters = {}
+        self._percentiles = (0.5, 0.9, 0.99)
+
+    def is_enabled(self):
+        """
+        Returns true if metrics are being recorded.
+        """
+        return self._enabled
+
+    def enable(self):
+        """
+        Starts recording metrics.
+        """
+        self._enabled = True
+
+    def disable(self):
+        """
+        Stops recording metrics. Existing measurements are kept.
+        """
+        self._enabled = False
+
+    def reset(self):
+        """
+        Removes all recorded measurements.
+        """
+        self._series.clear()
+        self._counters.clear()
+
+    def record(self, name, value):
+        """
+        Takes a series name and a value as parameters.
+        Adds the value to the series, creating the series if needed.
+        """
+        series = self._series.get(name)
+        if series is None:
+            # Series layout: [count, sum, max, recent samples]
+            series = [0, 0, 0, deque(maxlen=self._sample_size)]
+            self._series[name] = series
+        series[0] += 1
+        series[1] += value
+        if value > series[2]:
+            series[2] = value
+        series[3].append(value)
+
+    def increment(self, name):
+        """
+        Takes a counter name as a parameter.
+        Adds one to the counter if metrics are enabled.
+        """
+        if self._enabled:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def get_count(self, name):
+        """
+        Takes a series or counter name as a parameter.
+        Returns the number of values recorded for the series,
+        or the value of the counter.
+        """
+        series = self._series.get(name)
+        if series is None:
+            return self._counters.get(name, 0)
+        return series[0]
+
+    def get_percentile(self, name, percent):
+        """
+        Takes a series name and a percent between 0 and 1 as parameters.
+        Returns the percentile of the recent samples of the series,
+        or None if nothing has been recorded.
+        """
+        series = self._series.get(name)
+        if series is None or len(series[3]) == 0:
+            return None
+        samples = sorted(series[3])
+        index = min(int(percent * len(samples)), len(samples) - 1)
+        return samples[index]
+
+    def to_dict(self):
+        """
+        Returns all series as a dictionary mapping each series name
+        to its count, sum, mean, max, and percentiles. Counters only
+        have a count.
+        """
+        metrics = {name: {"count": count} for name, count in self._counters.items()}
+        for name, series in self._series.items():
+            count, total, largest, samples = series
+            stats = {"count": count, "sum": total, "mean": total / count, "max": largest}
+            ordered = sorted(samples)
+            for percent in self._percentiles:
+                index = min(int(percent * len(ordered)), len(ordered) - 1)
+                stats[f"p{round(percent * 100)}"] = ordered[index]
+            metrics[name] = stats
+        return metrics
+
+    def to_text(self, prefix="chess"):
+        """
+        Takes a metric name prefix as a parameter.
+        Returns all series in the Prometheus text exposition format,
+        with each series exposed as a summary and each counter as a counter.
+        """
+        lines = []
+        for name, count in self._counters.items():
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}_total {count}")
+        for name, stats in self.to_dict().items():
+            if name in self._counters:
+                continue
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} summary")
+            for percent in self._percentiles:
+                value = stats[f"p{round(percent * 100)}"]
+                lines.append(f'{metric}{{quantile="{percent}"}} {value}')
+            lines.append(f"{metric}_sum {stats['sum']}")
+            lines.append(f"{metric}_count {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def timed(name):
+    """
+    Takes a series name as a parameter.
+    Returns a decorator that records the run time of a method, in
+    seconds, to the metrics returned by the instance's get_metrics method.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.get_metrics()
+            if not metrics.is_enabled():
+                return method(self, *args, **kwargs)
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.record(name, perf_counter() - start)
+        return wrapper
+    return decorator
@@ -8,10 +8,12 @@ class ChessPiece:
     direction, excluding the pawn which captures
     differently from where it can move to.
     """
-    def __init__(self, color, name, capture_dist):
+    def __init__(self, color, name, capture_dist, sliding=False):
         """
-        Takes a color, a name, and list of capture distances as parameters.
-        Initializes the chess piece with the color, name, and capture distance list.
+        Takes a color, a name, a list of capture distances, and a sliding
+        flag as parameters. Initializes the chess piece with the color, name,
+        and capture distance list. Sliding pieces list one step per direction
+        and can repeat that step any number of times along the board.
         """
         # Check if color is neither black nor white
         if color != "blk" and color != "wh":
@@ -28,6 +30,7 @@ class ChessPiece:
 
         # Set list of capture distances
         self._capture_dist = capture_dist
+        self._sliding = sliding
 
     def get_color(self):
         """
@@ -53,11 +56,24 @@ class ChessPiece:
         """
         return self._capture_dist
 
+    def is_sliding(self):
+        """
+        Returns true if the piece slides along its capture directions.
+        """
+        return self._sliding
+
     def is_valid_distance(self, dist):
         """
         Takes a distance as a parameter.
         Returns true if the given distance is within capture distance.
+        Sliding pieces reduce the distance to a single step first.
         """
+        if self._sliding:
+            steps = max(abs(dist[0]), abs(dist[1]))
+            if steps == 0 or dist[0] % steps != 0 or dist[1] % steps != 0:
+                return False
+            dist = (dist[0] // steps, dist[1] // steps)
+
         for dist_vals in self._capture_dist.values():
             if dist in dist_vals:
                 return True
@@ -91,6 +107,14 @@ class Pawn(ChessPiece):
         # Set first_move to True to track if pawn is moving for the first time
         self._first_move = True
 
+    def copy(self):
+        """
+        Returns a copy of the pawn with the same first move state.
+        """
+        pawn = Pawn.__new__(Pawn)
+        pawn.__dict__.update(self.__dict__)
+        return pawn
+
     def is_first_move(self):
         """
         Returns true if this is the pawn's first move.
@@ -103,6 +127,15 @@ class Pawn(ChessPiece):
         """
         self._first_move = False
 
+    def get_move_dist(self):
+        """
+        Returns the list of move distances, which
+        includes the double step if this is the first move.
+        """
+        if self._first_move is True:
+            return self._first_move_dist
+        return self._move_dist
+
     def is_valid_distance(self, dist, capture=True):
         """
         If capture is True, checks if the given distance
@@ -127,15 +160,13 @@ class Rook(ChessPiece):
     def __init__(self, color):
         """
         Takes a color as a parameter.
-        Initializes the rook chess piece with specific capture distances.
+        Initializes the rook chess piece with specific capture directions.
         """
-        self._capture_dist = {"left": ((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6), (0, 7)),
-                              "up": ((1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (7, 0)),
-                              "right": ((0, -1), (0, -2), (0, -3), (0, -4), (0, -5), (0, -6), (0, -7)),
-                              "down": ((-1, 0), (-2, 0), (-3, 0), (-4, 0), (-5, 0), (-6, 0), (-7, 0))}
+        self._capture_dist = {"left": ((0, 1),), "up": ((1, 0),),
+                              "right": ((0, -1),), "down": ((-1, 0),)}
 
-        # Invoke parent init method with name 'rook', color, and capture distance list
-        super().__init__(color, 'rook', self._capture_dist)
+        # Invoke parent init method with name 'rook', color, capture directions, and sliding
+        super().__init__(color, 'rook', self._capture_dist, True)
 
 
 class Knight(ChessPiece):
@@ -163,15 +194,13 @@ class Bishop(ChessPiece):
     def __init__(self, color):
         """
         Takes a color as a parameter.
-        Initializes the bishop chess piece with specific capture distances.
+        Initializes the bishop chess piece with specific capture directions.
         """
-        self._capture_dist = {"up_left": ((1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7)),
-                              "down_right": ((-1, -1), (-2, -2), (-3, -3), (-4, -4), (-5, -5), (-6, -6), (-7, -7)),
-                              "up_right": ((1, -1), (2, -2), (3, -3), (4, -4), (5, -5), (6, -6), (7, -7)),
-                              "down_left": ((-1, 1), (-2, 2), (-3, 3), (-4, 4), (-5, 5), (-6, 6), (-7, 7))}
+        self._capture_dist = {"up_left": ((1, 1),), "down_right": ((-1, -1),),
+                              "up_right": ((1, -1),), "down_left": ((-1, 1),)}
 
-        # Invoke parent init method with name 'bishop', color, and capture distance list
-        super().__init__(color, 'bishop', self._capture_dist)
+        # Invoke parent init method with name 'bishop', color, capture directions, and sliding
+        super().__init__(color, 'bishop', self._capture_dist, True)
 
 
 class Queen(ChessPiece):
@@ -181,19 +210,15 @@ class Queen(ChessPiece):
     def __init__(self, color):
         """
         Takes a color as a parameter.
-        Initializes the queen chess piece with specific capture distances.
-        """
-        self._capture_dist = {"left": ((0, 1), (0, 2), (0, 3), (0, 4), (0, 5), (0, 6), (0, 7)),
-                              "up": ((1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (7, 0)),
-                              "right": ((0, -1), (0, -2), (0, -3), (0, -4), (0, -5), (0, -6), (0, -7)),
-                              "down": ((-1, 0), (-2, 0), (-3, 0), (-4, 0), (-5, 0), (-6, 0), (-7, 0)),
-                              "up_left": ((1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7)),
-                              "down_right": ((-1, -1), (-2, -2), (-3, -3), (-4, -4), (-5, -5), (-6, -6), (-7, -7)),
-                              "up_right": ((1, -1), (2, -2), (3, -3), (4, -4), (5, -5), (6, -6), (7, -7)),
-                              "down_left": ((-1, 1), (-2, 2), (-3, 3), (-4, 4), (-5, 5), (-6, 6), (-7, 7))}
-
-        # Invoke parent init method with name 'queen', color, and capture distance list
-        super().__init__(color, 'queen', self._capture_dist)
+        Initializes the queen chess piece with specific capture directions.
+        """
+        self._capture_dist = {"left": ((0, 1),), "up": ((1, 0),),
+                              "right": ((0, -1),), "down": ((-1, 0),),
+                              "up_left": ((1, 1),), "down_right": ((-1, -1),),
+                              "up_right": ((1, -1),), "down_left": ((-1, 1),)}
+
+        # Invoke parent init method with name 'queen', color, capture directions, and sliding
+        super().__init__(color, 'queen', self._capture_dist, True)
 
 
 class King(ChessPiece):
@@ -0,0 +1,318 @@
+import argparse
+import importlib
+import json
+import math
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+from ChessGame import ChessGame
+
+
+def load_policy(spec):
+    """
+    Takes a policy spec of the form "package.module:function" as a
+    parameter. Returns the move policy it names. Policies are loaded
+    by name so each worker process can import them.
+    """
+    module_name, function_name = spec.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def schedule_matches(players, mode="round_robin", games_per_pair=2, challenger=None):
+    """
+    Takes a list of player names, a mode, the number of games per pair,
+    and the challenger for gauntlets as parameters. Round robins pair
+    every two players and gauntlets pair the challenger with every other
+    player. Each pair alternates colors from game to game.
+    Returns a list of matches with a match id, white, and black.
+    """
+    if mode == "round_robin":
+        pairs = [(players[i], players[j]) for i in range(len(players)) for j in range(i + 1, len(players))]
+    elif mode == "gauntlet":
+        if challenger not in players:
+            raise InvalidTournamentError
+        pairs = [(challenger, player) for player in players if player != challenger]
+    else:
+        raise InvalidTournamentError
+
+    matches = []
+    for first, second in pairs:
+        for game_num in range(games_per_pair):
+            white, black = (first, second) if game_num % 2 == 0 else (second, first)
+            matches.append({"match_id": len(matches), "white": white, "black": black})
+    return matches
+
+
+def raise_move_timeout(signum, frame):
+    """
+    Takes a signal number and a stack frame as parameters.
+    Signal handler that stops a policy that ran over its time budget.
+    """
+    raise MoveTimeoutError
+
+
+def call_policy(policy, game, color, time_budget=None):
+    """
+    Takes a move policy, a chess game, a color, and a time budget in
+    seconds as parameters. Returns the policy's move. When there is a
+    budget, a timer alarm interrupts the policy as soon as it runs over
+    the budget by raising MoveTimeoutError. Alarms only reach the main
+    thread, so elsewhere the policy runs to the end and play_game checks
+    the time afterwards.
+    """
+    if time_budget is None or not hasattr(signal, "setitimer") or \
+            threading.current_thread() is not threading.main_thread():
+        return policy(game, color)
+
+    previous_handler = signal.signal(signal.SIGALRM, raise_move_timeout)
+    signal.setitimer(signal.ITIMER_REAL, time_budget)
+    try:
+        return policy(game, color)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def play_game(white_policy, black_policy, time_budget=None, max_plies=400, geometry=None):
+    """
+    Takes two move policies, a per-move time budget in seconds, a ply
+    limit, and an optional board geometry as parameters. Plays a full
+    fog of war game without printing. Policies receive the game and
+    their color and are trusted to only look at their own perspective.
+    A player loses if its policy runs over the time budget, raises an
+    error, returns an illegal move, or has no move. The game is a draw
+    at the ply limit.
+    Returns the result ("1-0", "0-1", or "1/2-1/2"), the reason, and the plies played.
+    """
+    game = ChessGame(geometry)
+    game.get_metrics().disable()
+    policies = {"white": white_policy, "black": black_policy}
+    losses = {"white": "0-1", "black": "1-0"}
+    while game.get_game_state() == "UNFINISHED":
+        if game.get_ply() >= max_plies:
+            return "1/2-1/2", "ply_limit", game.get_ply()
+        color = game.get_player_turn()
+        start = perf_counter()
+        try:
+            move = call_policy(policies[color], game, color, time_budget)
+        except MoveTimeoutError:
+            return losses[color], "time", game.get_ply()
+        except Exception:
+            return losses[color], "error", game.get_ply()
+        if time_budget is not None and perf_counter() - start > time_budget:
+            return losses[color], "time", game.get_ply()
+        if move is None:
+            return losses[color], "no_moves", game.get_ply()
+        if game.apply_moves((move,)) is not None:
+            return losses[color], "illegal_move", game.get_ply()
+
+    if game.get_game_state() == "WHITE_WON":
+        return "1-0", "king_captured", game.get_ply()
+    return "0-1", "king_captured", game.get_ply()
+
+
+def play_match(match, policy_specs, time_budget, max_plies):
+    """
+    Takes a match, a map of player names to policy specs, a time budget,
+    and a ply limit as parameters. Plays the match in a worker process.
+    Returns the match with its result, reason, and plies.
+    """
+    white_policy = load_policy(policy_specs[match["white"]])
+    black_policy = load_policy(policy_specs[match["black"]])
+    result, reason, plies = play_game(white_policy, black_policy, time_budget, max_plies)
+    return dict(match, result=result, reason=reason, plies=plies)
+
+
+def load_results(results_path):
+    """
+    Takes the path of a results file as a parameter.
+    Returns the finished matches recorded in the file. A partly
+    written last line, left by a crash, is ignored.
+    """
+    results = []
+    if not os.path.exists(results_path):
+        return results
+    with open(results_path) as file:
+        for line in file:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return results
+
+
+def run_tournament(policy_specs, results_path, mode="round_robin", games_per_pair=2, challenger=None,
+                   time_budget=None, max_plies=400, processes=None):
+    """
+    Takes a map of player names to policy specs, a results path, a mode,
+    the games per pair, a gauntlet challenger, a per-move time budget,
+    a ply limit, and a number of processes as parameters. Plays every
+    scheduled match on a pool of worker processes and appends each
+    result to the results file as soon as it finishes. Matches already
+    in the results file are skipped, so a stopped run can be resumed
+    by running it again with the same arguments.
+    Returns the results of every match.
+    """
+    matches = schedule_matches(list(policy_specs), mode, games_per_pair, challenger)
+    # Load every policy once so a bad spec fails before any game is played
+    for spec in policy_specs.values():
+        load_policy(spec)
+    results = load_results(results_path)
+    finished = {(result["match_id"], result["white"], result["black"]) for result in results}
+    remaining = [match for match in matches if (match["match_id"], match["white"], match["black"]) not in finished]
+
+    # Rewrite the file so a partly written last line is dropped
+    with open(results_path, "w") as file:
+        file.writelines(json.dumps(result) + "\n" for result in results)
+
+    with open(results_path, "a") as file, ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(play_match, match, policy_specs, time_budget, max_plies) for match in remaining]
+        for future in as_completed(futures):
+            result = future.result()
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+            results.append(result)
+    return results
+
+
+def estimate_ratings(results, iterations=1000):
+    """
+    Takes a list of match results and a number of iterations as parameters.
+    Fits Bradley-Terry strengths with minorization-maximization, counting
+    draws as half a win, and converts them to Elo ratings centered on 0.
+    Every player also draws one virtual game against a 0 rated player, which
+    keeps ratings finite for players that won or lost every game.
+    Confidence intervals come from the inverse of the Fisher information
+    of all ratings together, so they include the opponents' uncertainty.
+    Returns a list of ratings, best first, with 95% confidence intervals.
+    """
+    scores = {"1-0": (1, 0), "0-1": (0, 1), "1/2-1/2": (0.5, 0.5)}
+    players = sorted({result["white"] for result in results} | {result["black"] for result in results})
+    wins = {player: 0.5 for player in players}
+    games = {player: {} for player in players}
+    for result in results:
+        white_score, black_score = scores[result["result"]]
+        white, black = result["white"], result["black"]
+        wins[white] += white_score
+        wins[black] += black_score
+        games[white][black] = games[white].get(black, 0) + 1
+        games[black][white] = games[black].get(white, 0) + 1
+
+    # Strength of the virtual opponent is fixed at 1
+    strengths = {player: 1.0 for player in players}
+    for _ in range(iterations):
+        updated = {}
+        for player in players:
+            denominator = 1 / (strengths[player] + 1)
+            for opponent, count in games[player].items():
+                denominator += count / (strengths[player] + strengths[opponent])
+            updated[player] = wins[player] / denominator
+        change = max(abs(updated[player] - strengths[player]) for player in players) if players else 0
+        strengths = updated
+        if change < 1e-9:
+            break
+
+    elo = {player: 400 * math.log10(strengths[player]) for player in players}
+    mean_elo = sum(elo.values()) / len(players) if players else 0
+
+    # Fisher information matrix of all ratings, including the virtual games
+    scale = math.log(10) / 400
+    information = [[0.0] * len(players) for _ in players]
+    for i, player in enumerate(players):
+        expected = 1 / (1 + 10 ** (-elo[player] / 400))
+        information[i][i] += expected * (1 - expected) * scale ** 2
+        for opponent, count in games[player].items():
+            expected = 1 / (1 + 10 ** ((elo[opponent] - elo[player]) / 400))
+            term = count * expected * (1 - expected) * scale ** 2
+            information[i][i] += term
+            information[i][players.index(opponent)] -= term
+
+    ratings = []
+    for i, player in enumerate(players):
+        # Variance of the centered rating, which moves with every other rating
+        weights = [(j == i) - 1 / len(players) for j in range(len(players))]
+        covariance = solve_linear(information, weights)
+        variance = sum(weight * value for weight, value in zip(weights, covariance))
+        margin = 1.96 * math.sqrt(variance) if variance > 0 else math.inf
+        rating = elo[player] - mean_elo
+        total_games = sum(games[player].values())
+        ratings.append({"player": player, "elo": rating, "ci_low": rating - margin, "ci_high": rating + margin,
+                        "games": total_games, "score": wins[player] - 0.5})
+    ratings.sort(key=lambda entry: entry["elo"], reverse=True)
+    return ratings
+
+
+def solve_linear(matrix, vector):
+    """
+    Takes a square matrix and a vector, as lists, as parameters.
+    Solves the linear system with Gaussian elimination and partial
+    pivoting. Returns the solution as a list.
+    """
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(rows[row][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for row in range(col + 1, size):
+            factor = rows[row][col] / rows[col][col]
+            for k in range(col, size + 1):
+                rows[row][k] -= factor * rows[col][k]
+
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        known = sum(rows[row][k] * solution[k] for k in range(row + 1, size))
+        solution[row] = (rows[row][size] - known) / rows[row][row]
+    return solution
+
+
+def format_ratings(ratings):
+    """
+    Takes a list of ratings as a parameter.
+    Returns the ratings as a text table.
+    """
+    lines = [f"{'Player':<20} {'Elo':>7} {'95% CI':>17} {'Games':>6} {'Score':>7}"]
+    for entry in ratings:
+        interval = f"[{entry['ci_low']:.0f}, {entry['ci_high']:.0f}]"
+        lines.append(f"{entry['player']:<20} {entry['elo']:>7.0f} {interval:>17} {entry['games']:>6} "
+                     f"{entry['score']:>7.1f}")
+    return "\n".join(lines)
+
+
+class InvalidTournamentError(Exception):
+    """
+    Exception for invalid tournament settings.
+    Mode must be "round_robin" or "gauntlet", and a gauntlet
+    challenger must be one of the players.
+    """
+    pass
+
+
+class MoveTimeoutError(Exception):
+    """
+    Exception raised inside a move policy that runs over its time budget.
+    """
+    pass
+
+
+# Run Code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a fog of war chess tournament between move policies.")
+    parser.add_argument("--player", action="append", required=True, metavar="NAME=MODULE:FUNCTION",
+                        help="player name and move policy, e.g. random=module.ChessBots:random_policy")
+    parser.add_argument("--results", required=True, help="results file, reused to resume a stopped run")
+    parser.add_argument("--mode", choices=("round_robin", "gauntlet"), default="round_robin")
+    parser.add_argument("--challenger", help="player that plays every other player in a gauntlet")
+    parser.add_argument("--games", type=int, default=2, help="games per pair of players")
+    parser.add_argument("--time-budget", type=float, help="seconds allowed per move")
+    parser.add_argument("--max-plies", type=int, default=400, help="plies before a game is drawn")
+    parser.add_argument("--processes", type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    specs = dict(player.split("=", 1) for player in args.player)
+    tournament_results = run_tournament(specs, args.results, args.mode, args.games, args.challenger,
+                                        args.time_budget, args.max_plies, args.processes)
+    print(format_ratings(estimate_ratings(tournament_results)))
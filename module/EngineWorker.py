@@ -0,0 +1,64 @@
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EngineWorker:
+    """
+    Runs engine and bot computations on a background thread so the
+    GUI stays responsive. Tasks run one at a time in the order they
+    were submitted, so they never change the game at the same time.
+    Finished results are handed back by poll, which the GUI calls
+    from its own thread with window.after.
+    """
+    def __init__(self):
+        """
+        Initializes the worker thread and the queue of finished tasks.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._finished = queue.Queue()
+        self._pending = 0
+
+    def submit(self, callback, func, *args, on_error=None):
+        """
+        Takes a callback, a function, the function's arguments, and an
+        optional error callback as parameters. Runs the function on the
+        worker thread. The next time poll is called, the callback is called
+        with the function's result, or the error callback is called with
+        the exception if the function raised one.
+        """
+        self._pending += 1
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(lambda done: self._finished.put((callback, on_error, done)))
+
+    def is_busy(self):
+        """
+        Returns true if a submitted task has not been polled yet.
+        """
+        return self._pending > 0
+
+    def poll(self):
+        """
+        Calls the callback of every finished task on the calling thread.
+        Errors raised by a task go to its error callback, or are printed
+        if it has none, so one failed task never stops the others.
+        """
+        while True:
+            try:
+                callback, on_error, future = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            self._pending -= 1
+            error = future.exception()
+            if error is None:
+                callback(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                traceback.print_exception(error)
+
+    def shutdown(self):
+        """
+        Stops the worker thread, cancelling any tasks that have not started.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
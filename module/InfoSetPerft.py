@@ -0,0 +1,118 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from ChessGame import ChessGame
+from module.PositionIndex import PositionHasher
+
+
+def count_paths(game, depth, hasher, table, leaves):
+    """
+    Takes a chess game, the remaining depth, a position hasher, a
+    transposition table, and the sets of leaf hashes as parameters.
+    Walks the game tree below the game depth first, making each move on
+    a copy that is dropped once its subtree is counted. The table maps
+    (position hash, remaining depth) to the number of paths below it, so
+    a transposed subtree is only walked once. The hashes of the distinct
+    positions, white views, and black views at the final depth are added
+    to the leaf sets. Returns the number of paths to the final depth.
+    """
+    key = hasher.hash_game(game, "all")
+    paths = table.get((key, depth))
+    if paths is not None:
+        return paths
+
+    positions, white_views, black_views = leaves
+    if depth == 0:
+        positions.add(key)
+        white_views.add(hasher.hash_game(game, "white"))
+        black_views.add(hasher.hash_game(game, "black"))
+        paths = 1
+    else:
+        paths = 0
+        if game.get_game_state() == "UNFINISHED":
+            for piece_pos, targets in game.get_all_legal_targets(game.get_player_turn()).items():
+                for target_pos in targets:
+                    child = game.copy()
+                    child.play_move(child.get_piece_at(piece_pos), piece_pos, target_pos, False)
+                    child.update_visible_pieces()
+                    paths += count_paths(child, depth - 1, hasher, table, leaves)
+    table[(key, depth)] = paths
+    return paths
+
+
+def perft_subtree(game, depth):
+    """
+    Takes a chess game and a depth as parameters. Counts the game tree
+    below the game with count_paths. Returns the number of paths to the
+    final depth, and the sets of hashes of the distinct positions, white
+    views, and black views there.
+    """
+    hasher = PositionHasher(game.get_geometry())
+    positions, white_views, black_views = set(), set(), set()
+    paths = count_paths(game, depth, hasher, {}, (positions, white_views, black_views))
+    return paths, positions, white_views, black_views
+
+
+def perft_root_move(move, depth, geometry):
+    """
+    Takes a root move, as a square index pair, a depth, and an optional
+    board geometry as parameters. Plays the move on a new game and runs
+    perft_subtree below it in a worker process.
+    """
+    game = ChessGame(geometry)
+    game.get_metrics().disable()
+    game.apply_moves((move,), False)
+    return perft_subtree(game, depth - 1)
+
+
+def info_set_perft(depth, geometry=None, processes=None):
+    """
+    Takes a depth, an optional board geometry, and a number of processes
+    as parameters. Counts, at the given depth from the starting position,
+    the paths through the game tree, the distinct positions, and the
+    distinct boards each player can be shown by get_board. The subtree of
+    each root move runs on a pool of worker processes, and positions that
+    are reached under more than one root move are merged afterwards.
+    Returns a dictionary of the counts along with the number of positions
+    per view for each player.
+    """
+    game = ChessGame(geometry)
+    geometry = game.get_geometry()
+    root_moves = [(geometry.pos_to_square(piece_pos), geometry.pos_to_square(target_pos))
+                  for piece_pos, targets in sorted(game.get_all_legal_targets("white").items())
+                  for target_pos in sorted(targets)]
+
+    if depth == 0:
+        paths, positions, white_views, black_views = perft_subtree(game, 0)
+    else:
+        paths = 0
+        positions, white_views, black_views = set(), set(), set()
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            subtrees = executor.map(perft_root_move, root_moves, [depth] * len(root_moves),
+                                    [geometry] * len(root_moves))
+            for subtree_paths, subtree_positions, subtree_white, subtree_black in subtrees:
+                paths += subtree_paths
+                positions |= subtree_positions
+                white_views |= subtree_white
+                black_views |= subtree_black
+
+    return {
+        "depth": depth,
+        "paths": paths,
+        "positions": len(positions),
+        "white_views": len(white_views),
+        "black_views": len(black_views),
+        "white_positions_per_view": len(positions) / len(white_views) if white_views else 0,
+        "black_positions_per_view": len(positions) / len(black_views) if black_views else 0,
+    }
+
+
+# Run Code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count positions and fog of war views in the game tree.")
+    parser.add_argument("depth", type=int, help="number of plies to search")
+    parser.add_argument("--processes", type=int, help="number of worker processes")
+    args = parser.parse_args()
+
+    for name, value in info_set_perft(args.depth, processes=args.processes).items():
+        print(f"{name}: {value:.3f}" if type(value) is float else f"{name}: {value}")
@@ -0,0 +1,223 @@
+import heapq
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+from ChessGame import ChessGame
+from module.BoardGeometry import BoardGeometry
+
+# Record layout: position hash, game id, ply
+RECORD = struct.Struct("<QQI")
+# Header layout: magic, version, board width, board height, record count
+HEADER = struct.Struct("<8sIIIQ")
+INDEX_MAGIC = b"FOWINDEX"
+INDEX_VERSION = 1
+
+
+class PositionHasher:
+    """
+    Computes 64-bit Zobrist hashes of boards, as returned by get_board.
+    Each perspective and each icon on each square has its own random key,
+    so the full board and each player's view of the same position hash
+    differently. Keys come from a fixed seed, so hashes are the same in
+    every process that uses the same board geometry.
+    """
+    def __init__(self, geometry=None, seed=20250901):
+        """
+        Takes an optional board geometry and a seed as parameters.
+        """
+        self._geometry = geometry if geometry is not None else BoardGeometry()
+        rng = random.Random(seed)
+        icons = "pnbrqkPNBRQK?"
+        total_squares = self._geometry.get_total_squares()
+        self._square_keys = [{icon: rng.getrandbits(64) for icon in icons} for _ in range(total_squares)]
+        self._perspective_keys = {perspective: rng.getrandbits(64) for perspective in ("all", "white", "black")}
+        self._turn_keys = {color: rng.getrandbits(64) for color in ("white", "black")}
+
+    def get_geometry(self):
+        """
+        Returns the board geometry the keys were made for.
+        """
+        return self._geometry
+
+    def hash_board(self, board, perspective, player_turn):
+        """
+        Takes a board, as returned by get_board, its perspective,
+        and the player turn as parameters. Returns the board's hash.
+        Empty squares do not change the hash.
+        """
+        value = self._perspective_keys[perspective] ^ self._turn_keys[player_turn]
+        square = 0
+        for icons in board:
+            for icon in icons:
+                if icon != ' ':
+                    value ^= self._square_keys[square][icon]
+                square += 1
+        return value
+
+    def hash_game(self, game, perspective):
+        """
+        Takes a chess game and a perspective as parameters.
+        Returns the hash of the game's board from the perspective.
+        """
+        return self.hash_board(game.get_board(perspective), perspective, game.get_player_turn())
+
+
+class PositionIndex:
+    """
+    Read-only index from position hashes to the (game id, ply) pairs
+    where each position occurs. Records are fixed-width and sorted by
+    hash, and the file is memory-mapped, so opening the index reads
+    nothing and a lookup is a binary search over the mapped records.
+    Build index files with build_position_index.
+    """
+    def __init__(self, path):
+        """
+        Takes the path of an index file as a parameter.
+        """
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, height, count = HEADER.unpack_from(self._data, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise InvalidIndexError
+        self._hasher = PositionHasher(BoardGeometry(width, height))
+        self._count = count
+
+    def __len__(self):
+        """
+        Returns the number of records in the index.
+        """
+        return self._count
+
+    def get_hasher(self):
+        """
+        Returns the hasher used to build the index.
+        """
+        return self._hasher
+
+    def find_hash(self, position_hash):
+        """
+        Takes a position hash as a parameter.
+        Returns a list of (game id, ply) pairs where the position occurs.
+        """
+        data = self._data
+        size = RECORD.size
+        offset = HEADER.size
+
+        # Binary search for the first record with the hash
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(data, offset + middle * size)[0] < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+
+        matches = []
+        while low < self._count:
+            record_hash, game_id, ply = RECORD.unpack_from(data, offset + low * size)
+            if record_hash != position_hash:
+                break
+            matches.append((game_id, ply))
+            low += 1
+        return matches
+
+    def find_game(self, game, perspective):
+        """
+        Takes a chess game and a perspective as parameters.
+        Returns a list of (game id, ply) pairs where the board, as seen
+        from the perspective with the same player to move, occurs.
+        """
+        return self.find_hash(self._hasher.hash_game(game, perspective))
+
+    def close(self):
+        """
+        Closes the memory map and the index file.
+        """
+        self._data.close()
+        self._file.close()
+
+
+def build_position_index(games, path, geometry=None, perspectives=("all", "white", "black"), run_size=1000000):
+    """
+    Takes an iterable of (game id, moves) pairs, an output path, an optional
+    board geometry, the perspectives to index, and a run size as parameters.
+    Game ids must be non-negative integers and moves are square index pairs.
+    Replays each game, hashing every position from each perspective, and
+    writes the sorted index file. Records are sorted in runs of run_size
+    that are written to temporary files and merged, so games are streamed
+    and memory use does not grow with the size of the archive.
+    Returns the number of records written.
+    """
+    hasher = PositionHasher(geometry)
+    geometry = hasher.get_geometry()
+    directory = os.path.dirname(os.path.abspath(path))
+    run_paths = []
+    records = []
+    try:
+        for game_id, moves in games:
+            game = ChessGame(geometry)
+            game.get_metrics().disable()
+            for ply in range(len(moves) + 1):
+                # Hash the position before the move at this ply
+                for perspective in perspectives:
+                    records.append((hasher.hash_game(game, perspective), game_id, ply))
+                if ply == len(moves) or game.apply_moves((moves[ply],)) is not None:
+                    break
+            if len(records) >= run_size:
+                run_paths.append(write_index_run(records, directory))
+                records = []
+        records.sort()
+
+        # Merge sorted runs with the remaining records into the index file
+        runs = [read_index_run(run_path) for run_path in run_paths]
+        count = 0
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, geometry.get_width(), geometry.get_height(), 0))
+            for record in heapq.merge(records, *runs):
+                file.write(RECORD.pack(*record))
+                count += 1
+            file.seek(0)
+            file.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, geometry.get_width(), geometry.get_height(), count))
+        os.replace(temp_path, path)
+        return count
+    finally:
+        for run_path in run_paths:
+            os.remove(run_path)
+
+
+def write_index_run(records, directory):
+    """
+    Takes a list of records and a directory as parameters.
+    Sorts the records and writes them to a temporary file.
+    Returns the path of the file.
+    """
+    records.sort()
+    handle, run_path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(handle, "wb") as file:
+        file.write(b"".join(RECORD.pack(*record) for record in records))
+    return run_path
+
+
+def read_index_run(run_path):
+    """
+    Takes the path of a run file as a parameter.
+    Yields its records in order.
+    """
+    with open(run_path, "rb") as file:
+        while True:
+            chunk = file.read(RECORD.size * 4096)
+            if not chunk:
+                return
+            yield from RECORD.iter_unpack(chunk)
+
+
+class InvalidIndexError(Exception):
+    """
+    Exception for files that are not position index files.
+    """
+    pass